@@ -2,23 +2,38 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import logging
+from collections import ChainMap
+from collections.abc import Mapping
 from datetime import timedelta
+from operator import itemgetter
 from typing import Any
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, callback
+import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.loader import async_get_integration
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
+    PLATFORMS,
+    SERVICE_UPDATE_DATA,
+    SERVICE_RUN_ANALYTICS,
+    SERVICE_GET_STATUS,
     DEFAULT_SCAN_INTERVAL,
+    MAX_CACHED_DATA_AGE,
+    FAILURE_RETRY_INTERVAL,
     CONF_INFLUXDB_URL,
     CONF_INFLUXDB_USERNAME,
     CONF_INFLUXDB_PASSWORD,
     CONF_INFLUXDB_DATABASE,
+    CONF_INFLUXDB_UDP_PORT,
     CONF_GOOGLE_SHEETS_ID,
     CONF_UPDATE_INTERVAL,
     CONF_AUTO_SYNC_SHEETS,
@@ -27,10 +42,39 @@ from .portfolio_manager import PortfolioManager
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [
-    Platform.SENSOR,
-    Platform.BINARY_SENSOR,
-]
+# Position fields shown in the portfolio value sensor's top_positions attribute
+TOP_POSITION_KEYS = ("symbol", "value", "change")
+
+# Auto-sync outcomes reported in coordinator data
+SYNC_SUCCESS = "success"
+SYNC_FAILED = "failed"
+
+# Service schemas are built once at import
+UPDATE_DATA_SCHEMA = vol.Schema({})
+UPDATE_DATA_RESPONSE_SCHEMA = vol.Schema({
+    vol.Required("success"): bool,
+    vol.Optional("message"): str,
+    vol.Optional("error"): str,
+})
+
+RUN_ANALYTICS_SCHEMA = vol.Schema({
+    vol.Optional("days", default=30, description="Number of days to analyze"): vol.All(
+        cv.positive_int, vol.Range(min=1, max=365)
+    )
+})
+RUN_ANALYTICS_RESPONSE_SCHEMA = vol.Schema({
+    vol.Required("success"): bool,
+    vol.Optional("analytics"): dict,
+    vol.Optional("days_analyzed"): int,
+    vol.Optional("error"): str,
+})
+
+GET_STATUS_SCHEMA = vol.Schema({})
+GET_STATUS_RESPONSE_SCHEMA = vol.Schema({
+    vol.Required("success"): bool,
+    vol.Optional("status"): dict,
+    vol.Optional("error"): str,
+})
 
 
 class PortfolioDataUpdateCoordinator(DataUpdateCoordinator):
@@ -50,11 +94,38 @@ class PortfolioDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=update_interval,
         )
         self.portfolio_manager = portfolio_manager
+        self._default_update_interval = update_interval
         self._last_successful_data = None
+        self._last_successful_dt = None
+        # Position views for sensor attributes, rebuilt once per update and
+        # shared by every sensor instead of being re-sorted on each state read
+        self.top_positions: list[dict[str, Any]] = []
+        self.positions_view: list[dict[str, Any]] = []
+        # Whether the current data carries no error; read by every sensor's
+        # available property, so it is worked out once per update
+        self.data_error_free = False
+        # Bumped for every new data set so entities can cache derived values
+        self.data_revision = 0
 
-    async def _async_update_data(self) -> dict[str, Any]:
+    def _update_position_views(self, data: Mapping[str, Any]) -> None:
+        """Rebuild the shared position views from new coordinator data."""
+        # PortfolioManager emits positions with exactly the attribute keys
+        # (symbol, value, quantity, change), so the list is used as-is
+        positions = data.get("positions", [])
+        # PortfolioManager always fills "value" (0.0 when missing)
+        # Top-5 selection without sorting the whole list
+        top_positions = heapq.nlargest(5, positions, key=itemgetter("value"))
+        self.top_positions = [
+            {key: pos[key] for key in TOP_POSITION_KEYS} for pos in top_positions
+        ]
+        self.positions_view = positions
+
+    async def _async_update_data(self) -> Mapping[str, Any]:
         """Fetch data from portfolio tracker."""
-        data = {}
+        # Coordinator-level status is layered over the portfolio payload with a
+        # ChainMap, so the (potentially large) payload is never copied
+        status: dict[str, Any] = {}
+        portfolio_data: Mapping[str, Any] = {}
         errors = []
         
         # Check if auto-sync is enabled
@@ -66,68 +137,88 @@ class PortfolioDataUpdateCoordinator(DataUpdateCoordinator):
                 _LOGGER.debug("Auto-syncing data from Google Sheets to InfluxDB...")
                 sync_success = await self.portfolio_manager.async_update_portfolio_data()
                 if sync_success:
-                    _LOGGER.info("Successfully synced Google Sheets data to InfluxDB")
-                    data["last_sync"] = "success"
+                    # The fetch below must see the freshly written points
+                    await self.portfolio_manager.async_flush()
+                    _LOGGER.debug("Successfully synced Google Sheets data to InfluxDB")
+                    status["last_sync"] = SYNC_SUCCESS
                 else:
                     _LOGGER.warning("Failed to sync Google Sheets data to InfluxDB")
-                    data["last_sync"] = "failed"
+                    status["last_sync"] = SYNC_FAILED
             except Exception as err:
                 _LOGGER.warning("Error during auto-sync: %s", err)
-                data["last_sync"] = f"error: {err}"
+                status["last_sync"] = f"error: {err}"
         
-        try:
-            # Test InfluxDB connection first
-            influxdb_connected = await self.hass.async_add_executor_job(
-                self.portfolio_manager.test_connection
-            )
-            data["influxdb_status"] = "connected" if influxdb_connected else "disconnected"
-        except Exception as err:
-            _LOGGER.warning("InfluxDB connection test failed: %s", err)
-            data["influxdb_status"] = "disconnected"
-            data["influxdb_error"] = str(err)
-            errors.append(f"InfluxDB: {err}")
+        # Connection test, data fetch and Google Sheets status are independent
+        # remote calls, so run them concurrently instead of back to back
+        influxdb_result, portfolio_result, google_sheets_result = await asyncio.gather(
+            self.portfolio_manager.async_test_connection(),
+            self.portfolio_manager.async_get_portfolio_data(),
+            self.portfolio_manager.async_get_google_sheets_status(),
+            return_exceptions=True,
+        )
 
-        try:
-            # Get portfolio data from InfluxDB
-            portfolio_data = await self.hass.async_add_executor_job(
-                self.portfolio_manager.get_portfolio_data
-            )
-            data.update(portfolio_data)
-            
-            # Store successful data as backup
-            if not errors:
-                self._last_successful_data = data.copy()
-                
-        except Exception as err:
-            _LOGGER.warning("Portfolio data fetch failed: %s", err)
-            errors.append(f"Portfolio data: {err}")
+        if isinstance(influxdb_result, Exception):
+            _LOGGER.warning("InfluxDB connection test failed: %s", influxdb_result)
+            status["influxdb_status"] = "disconnected"
+            status["influxdb_error"] = str(influxdb_result)
+            errors.append(f"InfluxDB: {influxdb_result}")
+        else:
+            status["influxdb_status"] = "connected" if influxdb_result else "disconnected"
+
+        if isinstance(portfolio_result, Exception):
+            _LOGGER.warning("Portfolio data fetch failed: %s", portfolio_result)
+            errors.append(f"Portfolio data: {portfolio_result}")
             
-            # Return last successful data if available, otherwise raise error
-            if self._last_successful_data:
+            # Return last successful data if it is recent enough, otherwise raise error
+            cached_age = (
+                dt_util.utcnow() - self._last_successful_dt
+                if self._last_successful_data
+                else None
+            )
+            if cached_age is not None and cached_age < MAX_CACHED_DATA_AGE:
                 _LOGGER.info("Using last successful data due to fetch failure")
-                data.update(self._last_successful_data)
-                data["error"] = f"Using cached data - {err}"
+                portfolio_data = self._last_successful_data
+                status["error"] = f"Using cached data - {portfolio_result}"
+                status["cached_age_seconds"] = int(cached_age.total_seconds())
             else:
-                raise UpdateFailed(f"Error communicating with portfolio tracker: {err}")
+                # Retry sooner than the regular interval to recover quickly
+                self.update_interval = FAILURE_RETRY_INTERVAL
+                raise UpdateFailed(
+                    f"Error communicating with portfolio tracker: {portfolio_result}"
+                )
+        else:
+            portfolio_data = portfolio_result
 
-        # Get Google Sheets status
-        try:
-            google_sheets_status = await self.portfolio_manager.async_get_google_sheets_status()
-            data["google_sheets_status"] = google_sheets_status
-        except Exception as err:
-            _LOGGER.warning("Google Sheets status check failed: %s", err)
-            data["google_sheets_status"] = "disconnected"
-            data["google_sheets_error"] = str(err)
+        if isinstance(google_sheets_result, Exception):
+            _LOGGER.warning("Google Sheets status check failed: %s", google_sheets_result)
+            status["google_sheets_status"] = "disconnected"
+            status["google_sheets_error"] = str(google_sheets_result)
+        else:
+            status["google_sheets_status"] = google_sheets_result
 
         # Add data source status
-        data["data_sources"] = {
-            "influxdb_connected": data.get("influxdb_status") == "connected",
-            "google_sheets_connected": data.get("google_sheets_status") == "connected",
+        status["data_sources"] = {
+            "influxdb_connected": status.get("influxdb_status") == "connected",
+            "google_sheets_connected": status.get("google_sheets_status") == "connected",
         }
         
         if errors:
-            data["partial_errors"] = errors
-            
+            status["partial_errors"] = errors
+            self.update_interval = FAILURE_RETRY_INTERVAL
+        else:
+            self.update_interval = self._default_update_interval
+        
+        data = ChainMap(status, portfolio_data)
+        
+        if not errors:
+            # Store successful data as backup; data is rebuilt every cycle and
+            # not mutated after this point, so keep a reference instead of a copy
+            self._last_successful_data = data
+            self._last_successful_dt = dt_util.utcnow()
+        
+        self._update_position_views(data)
+        self.data_error_free = not data.get("error")
+        self.data_revision += 1
         return data
 
 
@@ -141,23 +232,28 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         CONF_INFLUXDB_USERNAME: entry.data[CONF_INFLUXDB_USERNAME],
         CONF_INFLUXDB_PASSWORD: entry.data[CONF_INFLUXDB_PASSWORD],
         CONF_INFLUXDB_DATABASE: entry.data.get(CONF_INFLUXDB_DATABASE, "portfolio"),
+        CONF_INFLUXDB_UDP_PORT: entry.data.get(CONF_INFLUXDB_UDP_PORT),
         CONF_GOOGLE_SHEETS_ID: entry.data.get(CONF_GOOGLE_SHEETS_ID),
         CONF_AUTO_SYNC_SHEETS: entry.data.get(CONF_AUTO_SYNC_SHEETS, True),
     }
 
     # Initialize portfolio manager with config entry for Google API access
     portfolio_manager = PortfolioManager(hass, config, entry)
-    
-    # Test the connection (non-blocking setup)
     try:
-        connection_test = await hass.async_add_executor_job(portfolio_manager.test_connection)
-        if not connection_test:
-            _LOGGER.warning("Portfolio Tracker InfluxDB connection test failed, but continuing setup. Check your InfluxDB configuration.")
-        else:
-            _LOGGER.info("Portfolio Tracker InfluxDB connection successful")
-    except Exception as err:
-        _LOGGER.warning("Failed to test portfolio tracker connection during setup: %s. Integration will continue loading but may not function correctly.", err)
-        # Don't fail setup completely - allow integration to load with limited functionality
+        await portfolio_manager.async_setup()
+    except Exception:
+        portfolio_manager.shutdown()
+        raise
+    
+    # Test the connection in the background; the first refresh below performs
+    # the same check, so setup does not need to wait for it
+    hass.async_create_background_task(
+        _async_log_connection_test(portfolio_manager),
+        name="portfolio_tracker_connection_test",
+    )
+
+    # Start background InfluxDB writers before the first sync can queue points
+    portfolio_manager.async_start_writers()
 
     # Create data update coordinator
     update_interval = timedelta(
@@ -168,13 +264,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
     # Fetch initial data so we have data when entities subscribe
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        portfolio_manager.shutdown()
+        raise
+
+    # Device software version follows the installed manifest
+    integration = await async_get_integration(hass, DOMAIN)
 
     # Store coordinator and manager in hass data
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "portfolio_manager": portfolio_manager,
+        "sw_version": str(integration.version),
     }
 
     # Setup platforms
@@ -190,11 +294,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_log_connection_test(portfolio_manager: PortfolioManager) -> None:
+    """Test the InfluxDB connection and log the outcome."""
+    try:
+        connection_test = await portfolio_manager.async_test_connection()
+        if not connection_test:
+            _LOGGER.warning("Portfolio Tracker InfluxDB connection test failed, but continuing setup. Check your InfluxDB configuration.")
+        else:
+            _LOGGER.info("Portfolio Tracker InfluxDB connection successful")
+    except Exception as err:
+        _LOGGER.warning("Failed to test portfolio tracker connection during setup: %s. Integration will continue loading but may not function correctly.", err)
+        # Don't fail setup completely - allow integration to load with limited functionality
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # Unload platforms
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data["portfolio_manager"].shutdown()
 
     return unload_ok
 
@@ -207,6 +325,8 @@ async def _async_setup_services(hass: HomeAssistant, portfolio_manager: Portfoli
         try:
             success = await portfolio_manager.async_update_portfolio_data()
             if success:
+                # Manual updates wait for the queued points to reach InfluxDB
+                await portfolio_manager.async_flush()
                 hass.bus.async_fire("portfolio_tracker_updated", {"status": "success"})
                 return {"success": True, "message": "Portfolio data updated successfully"}
             else:
@@ -221,9 +341,7 @@ async def _async_setup_services(hass: HomeAssistant, portfolio_manager: Portfoli
         """Service to run portfolio analytics."""
         days = call.data.get("days", 30)
         try:
-            result = await hass.async_add_executor_job(
-                portfolio_manager.run_analytics, days
-            )
+            result = await portfolio_manager.async_run_analytics(days)
             hass.bus.async_fire("portfolio_analytics_completed", {"status": "success", "result": result})
             return {"success": True, "analytics": result, "days_analyzed": days}
         except Exception as err:
@@ -234,7 +352,7 @@ async def _async_setup_services(hass: HomeAssistant, portfolio_manager: Portfoli
     async def get_portfolio_status(call) -> dict:
         """Service to get portfolio system status."""
         try:
-            status = await hass.async_add_executor_job(portfolio_manager.get_system_status)
+            status = await portfolio_manager.async_get_system_status()
             hass.bus.async_fire("portfolio_status_retrieved", {"status": "success", "data": status})
             return {"success": True, "status": status}
         except Exception as err:
@@ -242,74 +360,25 @@ async def _async_setup_services(hass: HomeAssistant, portfolio_manager: Portfoli
             hass.bus.async_fire("portfolio_status_retrieved", {"status": "error", "error": str(err)})
             return {"success": False, "error": str(err)}
 
-    # Register services with improved schema validation
-    try:
-        import voluptuous as vol
-        import homeassistant.helpers.config_validation as cv
-        schema_available = True
-    except ImportError as err:
-        _LOGGER.warning("Schema validation libraries not available: %s. Services will be registered without schema validation.", err)
-        schema_available = False
-    
-    # Register update_data service
-    if schema_available:
-        hass.services.async_register(
-            DOMAIN, 
-            "update_data", 
-            update_portfolio_data,
-            schema=vol.Schema({}),
-            supports_response=vol.Schema({
-                vol.Required("success"): bool,
-                vol.Optional("message"): str,
-                vol.Optional("error"): str,
-            })
-        )
-    else:
-        hass.services.async_register(
-            DOMAIN, 
-            "update_data", 
-            update_portfolio_data
-        )
-    # Register run_analytics service
-    if schema_available:
-        hass.services.async_register(
-            DOMAIN, 
-            "run_analytics", 
-            run_analytics,
-            schema=vol.Schema({
-                vol.Optional("days", default=30, description="Number of days to analyze"): vol.All(
-                    cv.positive_int, vol.Range(min=1, max=365)
-                )
-            }),
-            supports_response=vol.Schema({
-                vol.Required("success"): bool,
-                vol.Optional("analytics"): dict,
-                vol.Optional("days_analyzed"): int,
-                vol.Optional("error"): str,
-            })
-        )
-    else:
-        hass.services.async_register(
-            DOMAIN, 
-            "run_analytics", 
-            run_analytics
-        )
-    # Register get_status service
-    if schema_available:
-        hass.services.async_register(
-            DOMAIN, 
-            "get_status", 
-            get_portfolio_status,
-            schema=vol.Schema({}),
-            supports_response=vol.Schema({
-                vol.Required("success"): bool,
-                vol.Optional("status"): dict,
-                vol.Optional("error"): str,
-            })
-        )
-    else:
-        hass.services.async_register(
-            DOMAIN, 
-            "get_status", 
-            get_portfolio_status
-        )
\ No newline at end of file
+    # Register services with module-level schemas
+    hass.services.async_register(
+        DOMAIN, 
+        SERVICE_UPDATE_DATA, 
+        update_portfolio_data,
+        schema=UPDATE_DATA_SCHEMA,
+        supports_response=UPDATE_DATA_RESPONSE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, 
+        SERVICE_RUN_ANALYTICS, 
+        run_analytics,
+        schema=RUN_ANALYTICS_SCHEMA,
+        supports_response=RUN_ANALYTICS_RESPONSE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, 
+        SERVICE_GET_STATUS, 
+        get_portfolio_status,
+        schema=GET_STATUS_SCHEMA,
+        supports_response=GET_STATUS_RESPONSE_SCHEMA,
+    )
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, Callable
 
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
@@ -17,6 +17,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, BINARY_SENSOR_TYPES
 from .portfolio_manager import PortfolioManager
+from .utils import get_device_info
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,19 +54,110 @@ async def async_setup_entry(
     """Set up Portfolio Tracker binary sensors based on a config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
     portfolio_manager = hass.data[DOMAIN][config_entry.entry_id]["portfolio_manager"]
+    sw_version = hass.data[DOMAIN][config_entry.entry_id]["sw_version"]
 
-    entities = []
-    for sensor_key, description in BINARY_SENSOR_DESCRIPTIONS.items():
-        entities.append(
+    async_add_entities(
+        [
             PortfolioBinarySensor(
                 coordinator=coordinator,
                 portfolio_manager=portfolio_manager,
                 description=description,
                 config_entry_id=config_entry.entry_id,
+                sw_version=sw_version,
             )
-        )
+            for description in BINARY_SENSOR_DESCRIPTIONS.values()
+        ],
+        True,
+    )
+
+
+def _is_on_data_source_health(sensor: PortfolioBinarySensor, data: dict, data_sources: dict) -> bool | None:
+    """Overall health - InfluxDB must be connected, Google Sheets optional but checked."""
+    influxdb_ok = data_sources.get("influxdb_connected", False)
+    
+    if sensor._google_sheets_configured:
+        # If Google Sheets is configured, it should also be connected for full health
+        google_sheets_ok = data_sources.get("google_sheets_connected", False)
+        return influxdb_ok and google_sheets_ok
+    
+    # If Google Sheets not configured, only InfluxDB health matters
+    return influxdb_ok
+
 
-    async_add_entities(entities, True)
+def _is_on_influxdb_connected(sensor: PortfolioBinarySensor, data: dict, data_sources: dict) -> bool | None:
+    """Return InfluxDB connection status."""
+    return data_sources.get("influxdb_connected", False)
+
+
+def _is_on_google_sheets_connected(sensor: PortfolioBinarySensor, data: dict, data_sources: dict) -> bool | None:
+    """Return None if not configured, otherwise return connection status."""
+    if not sensor._google_sheets_configured:
+        return None
+    return data_sources.get("google_sheets_connected", False)
+
+
+def _attributes_data_source_health(sensor: PortfolioBinarySensor, data: dict, data_sources: dict) -> dict[str, Any]:
+    """Build attributes for the overall data source health sensor."""
+    google_sheets_configured = sensor._google_sheets_configured
+    
+    attributes = {
+        "influxdb_status": "connected" if data_sources.get("influxdb_connected") else "disconnected",
+        "google_sheets_status": (
+            "connected" if data_sources.get("google_sheets_connected") 
+            else "disconnected" if google_sheets_configured 
+            else "not_configured"
+        ),
+        "google_sheets_configured": google_sheets_configured,
+        "last_successful_update": data.get("last_update"),
+        "total_configured_sources": 1 + (1 if google_sheets_configured else 0),
+        "total_connected_sources": sum(1 for v in data_sources.values() if v),
+        "auto_sync_enabled": sensor._auto_sync,
+    }
+    
+    if data.get("error"):
+        attributes["last_error"] = data.get("error")
+    if data.get("partial_errors"):
+        attributes["partial_errors"] = data.get("partial_errors")
+    
+    return attributes
+
+
+def _attributes_influxdb_connected(sensor: PortfolioBinarySensor, data: dict, data_sources: dict) -> dict[str, Any]:
+    """Build attributes for the InfluxDB connectivity sensor."""
+    return {
+        "connection_status": "connected" if data_sources.get("influxdb_connected") else "disconnected",
+        "last_check": data.get("last_update"),
+    }
+
+
+def _attributes_google_sheets_connected(sensor: PortfolioBinarySensor, data: dict, data_sources: dict) -> dict[str, Any]:
+    """Build attributes for the Google Sheets connectivity sensor."""
+    return {
+        "connection_status": "connected" if data_sources.get("google_sheets_connected") else "disconnected",
+        "last_check": data.get("last_update"),
+        "configured": sensor._google_sheets_configured,
+    }
+
+
+# Per-key handlers, bound once per entity instead of branching on every state read
+_IS_ON_HANDLERS: dict[str, Callable[[PortfolioBinarySensor, dict, dict], bool | None]] = {
+    "data_source_health": _is_on_data_source_health,
+    "influxdb_connected": _is_on_influxdb_connected,
+    "google_sheets_connected": _is_on_google_sheets_connected,
+}
+
+_ATTRIBUTE_BUILDERS: dict[str, Callable[[PortfolioBinarySensor, dict, dict], dict[str, Any]]] = {
+    "data_source_health": _attributes_data_source_health,
+    "influxdb_connected": _attributes_influxdb_connected,
+    "google_sheets_connected": _attributes_google_sheets_connected,
+}
+
+# (icon when on, icon when off)
+_STATE_ICONS: dict[str, tuple[str, str]] = {
+    "data_source_health": ("mdi:database-check", "mdi:database-remove"),
+    "influxdb_connected": ("mdi:database-check", "mdi:database-off"),
+    "google_sheets_connected": ("mdi:google", "mdi:google-spreadsheet"),
+}
 
 
 class PortfolioBinarySensor(CoordinatorEntity, BinarySensorEntity):
@@ -77,6 +169,7 @@ class PortfolioBinarySensor(CoordinatorEntity, BinarySensorEntity):
         portfolio_manager: PortfolioManager,
         description: BinarySensorEntityDescription,
         config_entry_id: str,
+        sw_version: str,
     ) -> None:
         """Initialize the binary sensor."""
         super().__init__(coordinator)
@@ -84,98 +177,53 @@ class PortfolioBinarySensor(CoordinatorEntity, BinarySensorEntity):
         self._portfolio_manager = portfolio_manager
         self._config_entry_id = config_entry_id
         
+        # Config is fixed for the lifetime of the entry; entities are recreated on reload
+        self._google_sheets_configured = bool(portfolio_manager.config.get("google_sheets_id"))
+        self._auto_sync = portfolio_manager.config.get("auto_sync_sheets", False)
+        
+        # Bind key-specific behaviour once
+        self._is_on_handler = _IS_ON_HANDLERS.get(description.key)
+        self._attribute_builder = _ATTRIBUTE_BUILDERS.get(description.key)
+        self._state_icons = _STATE_ICONS.get(description.key)
+        
+        # (coordinator data revision, data_sources) of the last lookup; data_sources
+        # is read by several properties per state write
+        self._data_sources_cache: tuple[int, dict[str, Any]] | None = None
+        
         # Set unique ID using standardized format
         self._attr_unique_id = f"{DOMAIN}_{config_entry_id}_{description.key}"
         
-        # Set device info
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, config_entry_id)},
-            "name": "Portfolio Tracker",
-            "manufacturer": "Portfolio Tracker",
-            "model": "Home Assistant Integration",
-            "sw_version": "0.1.0",
-        }
+        # Set device info (shared by all entities of this entry)
+        self._attr_device_info = get_device_info(config_entry_id, sw_version)
+
+    @property
+    def _data_sources(self) -> dict[str, Any]:
+        """Return the data source status, resolved once per coordinator data revision."""
+        revision = self.coordinator.data_revision
+        if self._data_sources_cache is not None and self._data_sources_cache[0] == revision:
+            return self._data_sources_cache[1]
+
+        data_sources = (self.coordinator.data or {}).get("data_sources", {})
+        self._data_sources_cache = (revision, data_sources)
+        return data_sources
 
     @property
     def is_on(self) -> bool | None:
         """Return True if the binary sensor is on."""
-        if not self.coordinator.data:
-            return None
-
         data = self.coordinator.data
-        key = self.entity_description.key
-        data_sources = data.get("data_sources", {})
-
-        if key == "data_source_health":
-            # Overall health - InfluxDB must be connected, Google Sheets optional but checked
-            influxdb_ok = data_sources.get("influxdb_connected", False)
-            google_sheets_configured = bool(self._portfolio_manager.config.get("google_sheets_id"))
-            
-            if google_sheets_configured:
-                # If Google Sheets is configured, it should also be connected for full health
-                google_sheets_ok = data_sources.get("google_sheets_connected", False)
-                return influxdb_ok and google_sheets_ok
-            else:
-                # If Google Sheets not configured, only InfluxDB health matters
-                return influxdb_ok
-                
-        elif key == "influxdb_connected":
-            return data_sources.get("influxdb_connected", False)
-        elif key == "google_sheets_connected":
-            # Return None if not configured, otherwise return connection status
-            if not self._portfolio_manager.config.get("google_sheets_id"):
-                return None
-            return data_sources.get("google_sheets_connected", False)
+        if not data or self._is_on_handler is None:
+            return None
 
-        return None
+        return self._is_on_handler(self, data, self._data_sources)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return the state attributes."""
-        if not self.coordinator.data:
-            return None
-
         data = self.coordinator.data
-        key = self.entity_description.key
-        data_sources = data.get("data_sources", {})
-
-        attributes = {}
-
-        if key == "data_source_health":
-            google_sheets_configured = bool(self._portfolio_manager.config.get("google_sheets_id"))
-            
-            attributes.update({
-                "influxdb_status": "connected" if data_sources.get("influxdb_connected") else "disconnected",
-                "google_sheets_status": (
-                    "connected" if data_sources.get("google_sheets_connected") 
-                    else "disconnected" if google_sheets_configured 
-                    else "not_configured"
-                ),
-                "google_sheets_configured": google_sheets_configured,
-                "last_successful_update": data.get("last_update"),
-                "total_configured_sources": 1 + (1 if google_sheets_configured else 0),
-                "total_connected_sources": len([k for k, v in data_sources.items() if v]),
-                "auto_sync_enabled": self._portfolio_manager.config.get("auto_sync_sheets", False),
-            })
-            
-            if data.get("error"):
-                attributes["last_error"] = data.get("error")
-            if data.get("partial_errors"):
-                attributes["partial_errors"] = data.get("partial_errors")
-
-        elif key == "influxdb_connected":
-            attributes.update({
-                "connection_status": "connected" if data_sources.get("influxdb_connected") else "disconnected",
-                "last_check": data.get("last_update"),
-            })
-
-        elif key == "google_sheets_connected":
-            attributes.update({
-                "connection_status": "connected" if data_sources.get("google_sheets_connected") else "disconnected",
-                "last_check": data.get("last_update"),
-                "configured": bool(self._portfolio_manager.config.get("google_sheets_id")),
-            })
+        if not data or self._attribute_builder is None:
+            return None
 
+        attributes = self._attribute_builder(self, data, self._data_sources)
         return attributes if attributes else None
 
     @property
@@ -189,22 +237,8 @@ class PortfolioBinarySensor(CoordinatorEntity, BinarySensorEntity):
     @property
     def icon(self) -> str | None:
         """Return the icon for the binary sensor."""
-        key = self.entity_description.key
-        
-        if key == "data_source_health":
-            if self.is_on:
-                return "mdi:database-check"
-            else:
-                return "mdi:database-remove"
-        elif key == "influxdb_connected":
-            if self.is_on:
-                return "mdi:database-check"
-            else:
-                return "mdi:database-off"
-        elif key == "google_sheets_connected":
-            if self.is_on:
-                return "mdi:google"
-            else:
-                return "mdi:google-spreadsheet"
+        if self._state_icons is None:
+            return self.entity_description.icon
         
-        return self.entity_description.icon
\ No newline at end of file
+        icon_on, icon_off = self._state_icons
+        return icon_on if self.is_on else icon_off
@@ -1,7 +1,13 @@
 """Config flow for Portfolio Tracker integration - InfluxDB v1 for HA Add-on."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
 import voluptuous as vol
@@ -11,6 +17,7 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 import homeassistant.helpers.config_validation as cv
+from homeassistant.util.json import json_loads
 # OAuth2 flow will be added in future version
 # from homeassistant.helpers import config_entry_oauth2_flow
 
@@ -20,23 +27,64 @@ from .const import (
     CONF_INFLUXDB_USERNAME,
     CONF_INFLUXDB_PASSWORD,
     CONF_INFLUXDB_DATABASE,
+    CONF_INFLUXDB_UDP_PORT,
     CONF_GOOGLE_SHEETS_ID,
     CONF_GOOGLE_CREDENTIALS_JSON,
     CONF_UPDATE_INTERVAL,
     CONF_AUTO_SYNC_SHEETS,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_INFLUXDB_URL,
+    GOOGLE_SHEETS_SCOPES,
 )
 from .utils import parse_influxdb_url
 
+# Resolve optional client libraries once; validation reports them as unavailable
+try:
+    from influxdb import InfluxDBClient as _INFLUXDB_CLIENT
+    from influxdb.exceptions import InfluxDBClientError
+    from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+except ImportError:
+    _INFLUXDB_CLIENT = None
+
+try:
+    from google.oauth2.service_account import Credentials as _GOOGLE_SA_CREDENTIALS
+except ImportError:
+    _GOOGLE_SA_CREDENTIALS = None
+
 _LOGGER = logging.getLogger(__name__)
 
+_REQUIRED_SA_FIELDS = frozenset(
+    {"type", "project_id", "private_key_id", "private_key", "client_email"}
+)
+
+# Connection fields normalised once when the form is submitted
+_STRIPPED_FIELDS = (CONF_INFLUXDB_USERNAME, CONF_INFLUXDB_PASSWORD, CONF_INFLUXDB_DATABASE)
+
+# Bound how long a config flow validation can hold an executor thread
+INFLUXDB_VALIDATION_CLIENT_TIMEOUT = 10  # seconds, per HTTP request
+VALIDATION_TIMEOUT = 15  # seconds, for the whole validation
+
+# Successful InfluxDB validations are reused briefly so re-submitting the form
+# (e.g. after fixing a Google field) does not repeat the connection test
+INFLUXDB_VALIDATION_TTL = 30  # seconds
+_INFLUXDB_VALIDATION_CACHE: dict[tuple[str, str, str, str], tuple[float, dict[str, Any]]] = {}
+
+# Clients created while validating are kept (LRU) so retries and re-submits
+# reuse the existing connection pool instead of re-handshaking; they are
+# closed once no config flow is left in progress
+INFLUXDB_CLIENT_POOL_SIZE = 4
+_CLIENT_POOL: OrderedDict[tuple[str, int, bool, str, str, str], Any] = OrderedDict()
+_CLIENT_POOL_LOCK = threading.Lock()
+
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_INFLUXDB_URL, default=DEFAULT_INFLUXDB_URL): str,
         vol.Required(CONF_INFLUXDB_USERNAME): str,
         vol.Required(CONF_INFLUXDB_PASSWORD): str,
         vol.Optional(CONF_INFLUXDB_DATABASE, default="portfolio"): str,
+        vol.Optional(CONF_INFLUXDB_UDP_PORT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=65535)
+        ),
         vol.Optional(CONF_GOOGLE_SHEETS_ID, description="Google Sheets document ID"): str,
         vol.Optional(CONF_GOOGLE_CREDENTIALS_JSON, description="Google Service Account JSON credentials"): str,
         vol.Optional(CONF_UPDATE_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(
@@ -46,30 +94,51 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+# Options schema is built once; per-entry values are injected as suggestions
+OPTIONS_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_UPDATE_INTERVAL): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=1440)
+        ),
+        vol.Optional(CONF_GOOGLE_SHEETS_ID, description="Google Sheets document ID"): str,
+        vol.Optional(CONF_GOOGLE_CREDENTIALS_JSON, description="Google Service Account JSON credentials"): str,
+    }
+)
+
+
+def _strip_connection_fields(user_input: dict[str, Any]) -> dict[str, Any]:
+    """Return user input with surrounding whitespace removed from InfluxDB fields."""
+    data = dict(user_input)
+    for key in _STRIPPED_FIELDS:
+        if isinstance(data.get(key), str):
+            data[key] = data[key].strip()
+    return data
+
 
 def _test_google_credentials(credentials_json: str) -> dict[str, str]:
     """Test Google service account credentials with detailed validation."""
     if not credentials_json:
         return {"valid": True}  # Optional
     
+    if _GOOGLE_SA_CREDENTIALS is None:
+        return {"valid": False, "error": "unknown_error", "details": "Google auth library not available"}
+    
     try:
-        import json
-        from google.oauth2.service_account import Credentials
-        
-        # Parse JSON
+        # Parse JSON (orjson-backed; its decode error subclasses json.JSONDecodeError)
         try:
-            credentials_data = json.loads(credentials_json)
+            credentials_data = json_loads(credentials_json)
         except json.JSONDecodeError as e:
             return {"valid": False, "error": "invalid_json", "details": f"Invalid JSON format: {e}"}
         
         # Check required fields
-        required_fields = ["type", "project_id", "private_key_id", "private_key", "client_email"]
-        missing_fields = [field for field in required_fields if field not in credentials_data]
+        if not isinstance(credentials_data, dict):
+            return {"valid": False, "error": "invalid_json", "details": "Credentials must be a JSON object"}
+        missing_fields = _REQUIRED_SA_FIELDS.difference(credentials_data)
         if missing_fields:
             return {
                 "valid": False, 
                 "error": "missing_fields", 
-                "details": f"Missing required fields: {', '.join(missing_fields)}"
+                "details": f"Missing required fields: {', '.join(sorted(missing_fields))}"
             }
         
         # Check if it's a service account
@@ -80,11 +149,20 @@ def _test_google_credentials(credentials_json: str) -> dict[str, str]:
                 "details": "Only service account credentials are supported. Found type: " + str(credentials_data.get("type"))
             }
         
+        # Reject obviously malformed keys before the (expensive) RSA key parse
+        private_key = credentials_data.get("private_key")
+        if not isinstance(private_key, str) or not private_key.lstrip().startswith("-----BEGIN "):
+            return {
+                "valid": False, 
+                "error": "credential_creation_failed", 
+                "details": "Failed to create credentials: private_key is not a PEM encoded key"
+            }
+        
         # Try to create credentials
         try:
-            Credentials.from_service_account_info(
+            _GOOGLE_SA_CREDENTIALS.from_service_account_info(
                 credentials_data, 
-                scopes=["https://www.googleapis.com/auth/spreadsheets.readonly"]
+                scopes=GOOGLE_SHEETS_SCOPES
             )
         except Exception as e:
             return {
@@ -104,18 +182,58 @@ def _test_google_credentials(credentials_json: str) -> dict[str, str]:
         return {"valid": False, "error": "unknown_error", "details": str(e)}
 
 
+def _password_digest(password: str) -> str:
+    """Return a digest of the password, so caches never hold it in plain text."""
+    return hashlib.blake2b(password.encode(), digest_size=16).hexdigest()
+
+
+def _get_pooled_influxdb_client(
+    host: str, port: int, username: str, password: str, database: str, ssl: bool
+) -> Any:
+    """Return a pooled InfluxDB client for these settings, creating it if needed."""
+    key = (host, port, ssl, username, _password_digest(password), database)
+    with _CLIENT_POOL_LOCK:
+        client = _CLIENT_POOL.get(key)
+        if client is not None:
+            _CLIENT_POOL.move_to_end(key)
+            return client
+        
+        client = _INFLUXDB_CLIENT(
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+            database=database,
+            ssl=ssl,
+            timeout=INFLUXDB_VALIDATION_CLIENT_TIMEOUT
+        )
+        _CLIENT_POOL[key] = client
+        if len(_CLIENT_POOL) > INFLUXDB_CLIENT_POOL_SIZE:
+            _, evicted = _CLIENT_POOL.popitem(last=False)
+            evicted.close()
+        return client
+
+
+def _close_pooled_influxdb_clients() -> None:
+    """Close all pooled InfluxDB clients (sync function for executor)."""
+    with _CLIENT_POOL_LOCK:
+        while _CLIENT_POOL:
+            _, client = _CLIENT_POOL.popitem()
+            try:
+                client.close()
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+
 def _test_influxdb_connection(data: dict[str, Any]) -> dict[str, Any]:
     """Test InfluxDB connection (sync function for executor)."""
-    # Import here to avoid dependency issues
-    try:
-        from influxdb import InfluxDBClient
-    except ImportError as err:
-        raise CannotConnect("InfluxDB v1 client not available") from err
+    if _INFLUXDB_CLIENT is None:
+        raise CannotConnect("InfluxDB v1 client not available")
 
     # Extract connection info
-    username = data[CONF_INFLUXDB_USERNAME].strip()
-    password = data[CONF_INFLUXDB_PASSWORD].strip()
-    database = data.get(CONF_INFLUXDB_DATABASE, "portfolio").strip()
+    username = data[CONF_INFLUXDB_USERNAME]
+    password = data[CONF_INFLUXDB_PASSWORD]
+    database = data.get(CONF_INFLUXDB_DATABASE, "portfolio")
     
     if not (username and password):
         raise InvalidAuth("Username and password are required")
@@ -129,36 +247,28 @@ def _test_influxdb_connection(data: dict[str, Any]) -> dict[str, Any]:
 
     # Test the connection
     try:
-        client = InfluxDBClient(
-            host=host,
-            port=port,
-            username=username,
-            password=password,
-            database=database,
-            ssl=ssl,
-            timeout=30
-        )
+        client = _get_pooled_influxdb_client(host, port, username, password, database, ssl)
         
         # Test connection by pinging
         client.ping()
         _LOGGER.info("InfluxDB v1 connection test successful")
         
-        # Test database access
-        try:
-            databases = client.get_list_database()
-            db_names = [db['name'] for db in databases]
-            if database not in db_names:
-                _LOGGER.warning("Database '%s' not found. Available: %s", database, db_names)
-        except Exception as e:
-            _LOGGER.warning("Could not list databases: %s", e)
-        
-        client.close()
+        # Listing databases is a second round-trip that only feeds a warning;
+        # only pay for it when debug logging is enabled
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            try:
+                databases = client.get_list_database()
+                db_names = [db['name'] for db in databases]
+                if database not in db_names:
+                    _LOGGER.warning("Database '%s' not found. Available: %s", database, db_names)
+            except Exception as e:
+                _LOGGER.warning("Could not list databases: %s", e)
         
     except Exception as exc:
         _LOGGER.exception("Connection validation failed")
-        if "authentication" in str(exc).lower() or "unauthorized" in str(exc).lower():
+        if isinstance(exc, InfluxDBClientError) and exc.code in (401, 403):
             raise InvalidAuth("Invalid username or password") from exc
-        elif "connection" in str(exc).lower():
+        elif isinstance(exc, (RequestsConnectionError, Timeout)):
             raise CannotConnect("Cannot connect to InfluxDB server") from exc
         else:
             raise CannotConnect(f"InfluxDB connection failed: {exc}") from exc
@@ -167,40 +277,88 @@ def _test_influxdb_connection(data: dict[str, Any]) -> dict[str, Any]:
     return {"title": f"Portfolio Tracker ({host}:{port})"}
 
 
+def _influxdb_validation_key(data: dict[str, Any]) -> tuple[str, str, str, str]:
+    """Return the cache key for an InfluxDB validation without storing the password."""
+    return (
+        data[CONF_INFLUXDB_URL],
+        data[CONF_INFLUXDB_USERNAME],
+        _password_digest(data[CONF_INFLUXDB_PASSWORD]),
+        data.get(CONF_INFLUXDB_DATABASE, "portfolio"),
+    )
+
+
+async def _async_validate_influxdb(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Test the InfluxDB connection, reusing a recent successful result."""
+    key = _influxdb_validation_key(data)
+    cached = _INFLUXDB_VALIDATION_CACHE.get(key)
+    if cached and time.monotonic() - cached[0] < INFLUXDB_VALIDATION_TTL:
+        return dict(cached[1])
+    
+    try:
+        result = await hass.async_add_executor_job(_test_influxdb_connection, data)
+    except (CannotConnect, InvalidAuth):
+        _INFLUXDB_VALIDATION_CACHE.pop(key, None)
+        raise
+    
+    # Drop expired results so failed or one-off attempts do not accumulate
+    now = time.monotonic()
+    for stale_key in [
+        cached_key
+        for cached_key, (validated_at, _) in _INFLUXDB_VALIDATION_CACHE.items()
+        if now - validated_at >= INFLUXDB_VALIDATION_TTL
+    ]:
+        del _INFLUXDB_VALIDATION_CACHE[stale_key]
+    _INFLUXDB_VALIDATION_CACHE[key] = (now, result)
+    return dict(result)
+
+
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect."""
-    # Test InfluxDB connection
-    influx_result = await hass.async_add_executor_job(_test_influxdb_connection, data)
-    
-    # Test Google credentials if provided
     google_credentials = data.get(CONF_GOOGLE_CREDENTIALS_JSON)
     google_sheets_id = data.get(CONF_GOOGLE_SHEETS_ID)
     
-    if google_credentials or google_sheets_id:
+    if google_credentials and not google_sheets_id:
         # If one is provided, both should be provided for full functionality
-        if google_credentials and not google_sheets_id:
-            raise InvalidAuth("Google Sheets ID is required when providing credentials")
-        elif google_sheets_id and not google_credentials:
-            _LOGGER.warning("Google Sheets ID provided but no credentials. Google Sheets sync will be disabled.")
-        elif google_credentials and google_sheets_id:
-            # Validate credentials
-            google_result = await hass.async_add_executor_job(_test_google_credentials, google_credentials)
-            if not google_result.get("valid"):
-                error_details = google_result.get("details", "Unknown error")
-                error_type = google_result.get("error", "unknown_error")
-                
-                if error_type == "invalid_json":
-                    raise InvalidAuth(f"Invalid Google credentials JSON: {error_details}")
-                elif error_type == "missing_fields":
-                    raise InvalidAuth(f"Incomplete Google credentials: {error_details}")
-                elif error_type == "not_service_account":
-                    raise InvalidAuth(f"Invalid credential type: {error_details}")
-                else:
-                    raise InvalidAuth(f"Google credentials validation failed: {error_details}")
+        raise InvalidAuth("Google Sheets ID is required when providing credentials")
+    if google_sheets_id and not google_credentials:
+        _LOGGER.warning("Google Sheets ID provided but no credentials. Google Sheets sync will be disabled.")
+    
+    # InfluxDB and Google checks are independent; run them concurrently
+    tasks = [_async_validate_influxdb(hass, data)]
+    if google_credentials and google_sheets_id:
+        tasks.append(hass.async_add_executor_job(_test_google_credentials, google_credentials))
+    
+    try:
+        async with asyncio.timeout(VALIDATION_TIMEOUT):
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+    except TimeoutError as err:
+        raise CannotConnect("Validation timed out") from err
+    influx_result = results[0]
+    google_result = results[1] if len(results) > 1 else None
+    
+    # InfluxDB errors take precedence over Google errors
+    if isinstance(influx_result, BaseException):
+        raise influx_result
+    if isinstance(google_result, BaseException):
+        raise google_result
+    
+    if google_result is not None:
+        if not google_result.get("valid"):
+            error_details = google_result.get("details", "Unknown error")
+            error_type = google_result.get("error", "unknown_error")
             
-            # Add Google validation info to result
-            influx_result["google_service_account"] = google_result.get("service_account_email")
-            influx_result["google_project"] = google_result.get("project_id")
+            if error_type == "invalid_json":
+                raise InvalidAuth(f"Invalid Google credentials JSON: {error_details}")
+            elif error_type == "missing_fields":
+                raise InvalidAuth(f"Incomplete Google credentials: {error_details}")
+            elif error_type == "not_service_account":
+                raise InvalidAuth(f"Invalid credential type: {error_details}")
+            else:
+                raise InvalidAuth(f"Google credentials validation failed: {error_details}")
+        
+        # Add Google validation info to result
+        influx_result["google_service_account"] = google_result.get("service_account_email")
+        influx_result["google_project"] = google_result.get("project_id")
     
     return influx_result
 
@@ -223,6 +381,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Handle the initial step."""
         errors: dict[str, str] = {}
         if user_input is not None:
+            user_input = _strip_connection_fields(user_input)
             try:
                 info = await validate_input(self.hass, user_input)
             except CannotConnect:
@@ -244,6 +403,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         )
 
+    @callback
+    def async_remove(self) -> None:
+        """Close the pooled validation clients once the last config flow ends."""
+        if not self.hass.config_entries.flow.async_progress_by_handler(DOMAIN):
+            self.hass.async_add_executor_job(_close_pooled_influxdb_clients)
+
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
     """Handle options flow for Portfolio Tracker."""
@@ -251,6 +416,8 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         """Initialize options flow."""
         self.config_entry = config_entry
+        # Options override the original setup data
+        self._defaults = {**config_entry.data, **config_entry.options}
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
@@ -259,33 +426,17 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             return self.async_create_entry(title="", data=user_input)
 
+        suggested_values = {
+            CONF_UPDATE_INTERVAL: self._defaults.get(CONF_UPDATE_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            CONF_GOOGLE_SHEETS_ID: self._defaults.get(CONF_GOOGLE_SHEETS_ID, ""),
+            CONF_GOOGLE_CREDENTIALS_JSON: self._defaults.get(CONF_GOOGLE_CREDENTIALS_JSON, ""),
+        }
+
         return self.async_show_form(
             step_id="init",
-            data_schema=vol.Schema({
-                vol.Optional(
-                    CONF_UPDATE_INTERVAL,
-                    default=self.config_entry.options.get(
-                        CONF_UPDATE_INTERVAL, 
-                        self.config_entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_SCAN_INTERVAL)
-                    )
-                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=1440)),
-                vol.Optional(
-                    CONF_GOOGLE_SHEETS_ID,
-                    default=self.config_entry.options.get(
-                        CONF_GOOGLE_SHEETS_ID,
-                        self.config_entry.data.get(CONF_GOOGLE_SHEETS_ID, "")
-                    ),
-                    description="Google Sheets document ID"
-                ): str,
-                vol.Optional(
-                    CONF_GOOGLE_CREDENTIALS_JSON,
-                    default=self.config_entry.options.get(
-                        CONF_GOOGLE_CREDENTIALS_JSON,
-                        self.config_entry.data.get(CONF_GOOGLE_CREDENTIALS_JSON, "")
-                    ),
-                    description="Google Service Account JSON credentials"
-                ): str,
-            }),
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_DATA_SCHEMA, suggested_values
+            ),
         )
 
 
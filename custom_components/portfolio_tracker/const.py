@@ -1,7 +1,10 @@
 """Constants for the Portfolio Tracker integration."""
 from __future__ import annotations
 
-from typing import Final
+from collections.abc import Mapping
+from datetime import timedelta
+from types import MappingProxyType
+from typing import Any, Final
 
 from homeassistant.const import Platform
 
@@ -15,6 +18,7 @@ CONF_INFLUXDB_URL: Final = "influxdb_url"
 CONF_INFLUXDB_USERNAME: Final = "influxdb_username"
 CONF_INFLUXDB_PASSWORD: Final = "influxdb_password"
 CONF_INFLUXDB_DATABASE: Final = "influxdb_database"
+CONF_INFLUXDB_UDP_PORT: Final = "influxdb_udp_port"
 CONF_GOOGLE_SHEETS_ID: Final = "google_sheets_id"
 CONF_GOOGLE_CREDENTIALS_JSON: Final = "google_credentials_json"
 CONF_UPDATE_INTERVAL: Final = "update_interval"
@@ -25,6 +29,15 @@ DEFAULT_SCAN_INTERVAL: Final = 30  # minutes
 DEFAULT_TIMEOUT: Final = 30  # seconds
 DEFAULT_INFLUXDB_URL: Final = "http://homeassistant.local:8086"
 DEFAULT_SHEET_RANGE: Final = "A1:Z3000"  # Default range for Google Sheets
+MAX_CACHED_DATA_AGE: Final = timedelta(hours=1)  # Serve stale data at most this long
+FAILURE_RETRY_INTERVAL: Final = timedelta(seconds=30)  # Poll interval after a failed update
+PORTFOLIO_DATA_CACHE_TTL: Final = 15  # seconds
+SYSTEM_STATUS_CACHE_TTL: Final = 60  # seconds
+INFLUXDB_HEALTH_MAX_AGE: Final = 60  # seconds a query outcome counts as a health check
+
+# Google API
+GOOGLE_SHEETS_SCOPES: Final = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
+SHEETS_DATA_CACHE_TTL: Final = 30  # seconds
 
 # Service names
 SERVICE_UPDATE_DATA: Final = "update_data"
@@ -37,7 +50,7 @@ EVENT_ANALYTICS_COMPLETED: Final = "portfolio_analytics_completed"
 EVENT_STATUS_RETRIEVED: Final = "portfolio_status_retrieved"
 
 # Error codes for better error handling
-ERROR_CODES = {
+ERROR_CODES: Final[Mapping[str, str]] = MappingProxyType({
     "INFLUXDB_CONNECTION_FAILED": "Failed to connect to InfluxDB",
     "INFLUXDB_AUTH_FAILED": "InfluxDB authentication failed",
     "INFLUXDB_DATABASE_NOT_FOUND": "InfluxDB database not found",
@@ -48,55 +61,55 @@ ERROR_CODES = {
     "DATA_SYNC_FAILED": "Failed to sync data from Google Sheets to InfluxDB",
     "DATA_FORMAT_INVALID": "Invalid data format in Google Sheets",
     "CONFIGURATION_INCOMPLETE": "Configuration is incomplete",
-}
+})
 
-# Entity types
-SENSOR_TYPES = {
-    "portfolio_value": {
+# Entity types (read-only)
+SENSOR_TYPES: Final[Mapping[str, Mapping[str, Any]]] = MappingProxyType({
+    "portfolio_value": MappingProxyType({
         "name": "Portfolio Value",
         "icon": "mdi:currency-usd",
         "unit": "$",
         "device_class": "monetary",
-    },
-    "daily_change": {
+    }),
+    "daily_change": MappingProxyType({
         "name": "Daily Change",
         "icon": "mdi:trending-up",
         "unit": "$",
         "device_class": "monetary",
-    },
-    "daily_change_percent": {
+    }),
+    "daily_change_percent": MappingProxyType({
         "name": "Daily Change Percent",
         "icon": "mdi:percent",
         "unit": "%",
-    },
-    "total_positions": {
+    }),
+    "total_positions": MappingProxyType({
         "name": "Total Positions",
         "icon": "mdi:format-list-numbered",
-    },
-    "last_update": {
+    }),
+    "last_update": MappingProxyType({
         "name": "Last Update",
         "icon": "mdi:clock",
         "device_class": "timestamp",
-    },
-}
+    }),
+})
 
-BINARY_SENSOR_TYPES = {
-    "data_source_health": {
+BINARY_SENSOR_TYPES: Final[Mapping[str, Mapping[str, Any]]] = MappingProxyType({
+    "data_source_health": MappingProxyType({
         "name": "Data Source Health",
         "icon": "mdi:database",
         "device_class": "connectivity",
-    },
-    "influxdb_connected": {
+    }),
+    "influxdb_connected": MappingProxyType({
         "name": "InfluxDB Connected",
         "icon": "mdi:database-check",
         "device_class": "connectivity",
-    },
-    "google_sheets_connected": {
+    }),
+    "google_sheets_connected": MappingProxyType({
         "name": "Google Sheets Connected",
         "icon": "mdi:google",
         "device_class": "connectivity",
-    },
-}
+    }),
+})
 
 # Column mapping for Google Sheets flexibility
 DEFAULT_COLUMN_MAPPING = {
@@ -105,4 +118,11 @@ DEFAULT_COLUMN_MAPPING = {
     "price": ["price", "current_price", "unit_price"],
     "value": ["value", "market_value", "total_value"],
     "change": ["change", "daily_change", "day_change"],
-}
\ No newline at end of file
+}
+
+# Reverse lookup: header alias -> canonical field name
+COLUMN_ALIAS_TO_CANONICAL: Final[Mapping[str, str]] = MappingProxyType({
+    alias: canonical
+    for canonical, aliases in DEFAULT_COLUMN_MAPPING.items()
+    for alias in aliases
+})
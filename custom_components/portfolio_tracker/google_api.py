@@ -1,165 +1,345 @@
-"""Google API integration using service account or API key authentication."""
+"""Google Sheets API integration using service account authentication."""
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-import os
-from typing import Any, Dict, List, Optional
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, TypeVar
 
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from google.auth.exceptions import RefreshError
-from google.oauth2.service_account import Credentials
-from google.oauth2.credentials import Credentials as UserCredentials
+import aiohttp
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE, async_get_clientsession
+from homeassistant.util.json import json_loads
 
-from .const import DOMAIN, CONF_GOOGLE_CREDENTIALS_JSON
+from .const import (
+    DOMAIN,
+    CONF_GOOGLE_CREDENTIALS_JSON,
+    DEFAULT_TIMEOUT,
+    GOOGLE_SHEETS_SCOPES,
+    SHEETS_DATA_CACHE_TTL,
+)
+
+# google-auth is only needed when Sheets sync is configured, so it is imported
+# inside the executor helpers below
+if TYPE_CHECKING:
+    from google.oauth2.service_account import Credentials
 
 _LOGGER = logging.getLogger(__name__)
 
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
+_T = TypeVar("_T")
+
+# Rows of one range; immutable because results are shared through the cache
+SheetRows = tuple[tuple[Any, ...], ...]
+
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+SHEETS_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
+# Google only gzips responses when the User-Agent also contains "gzip";
+# aiohttp decompresses transparently
+SHEETS_REQUEST_HEADERS = {
+    "Accept-Encoding": "gzip",
+    "User-Agent": f"{SERVER_SOFTWARE} {DOMAIN} (gzip)",
+}
+
+# Retries for 429 and 5xx responses, with randomised exponential backoff
+SHEETS_REQUEST_RETRIES = 3
+SHEETS_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+SHEETS_RETRY_MAX_DELAY = 30  # seconds
+
+
+@lru_cache(maxsize=8)
+def _service_account_credentials(credentials_json: str) -> Credentials:
+    """Create scoped service account credentials from JSON (sync, for executor).
+
+    Results are cached per JSON document, so reloads and entries sharing a
+    service account reuse one Credentials object (and its access token)
+    instead of re-parsing the private key.
+
+    Raises ValueError when the JSON is not a usable service account key;
+    malformed JSON raises json.JSONDecodeError, a ValueError subclass, and
+    google-auth errors for bad or encrypted keys are re-raised as ValueError.
+    """
+    credentials_data = json_loads(credentials_json)
+    if not isinstance(credentials_data, dict) or credentials_data.get("type") != "service_account":
+        raise ValueError("Only service account credentials are supported")
+
+    from google.auth.exceptions import GoogleAuthError
+    from google.oauth2.service_account import Credentials
+
+    try:
+        return Credentials.from_service_account_info(
+            credentials_data, scopes=GOOGLE_SHEETS_SCOPES
+        )
+    except (GoogleAuthError, TypeError) as e:
+        raise ValueError(f"Invalid service account key: {e}") from e
+
+
+@lru_cache(maxsize=1)
+def _auth_request() -> Any:
+    """Return the shared transport used for token refreshes.
+
+    One pooled requests.Session keeps the connection to Google's token
+    endpoint alive between refreshes instead of opening a new one each time.
+    """
+    import requests
+    from google.auth.transport.requests import Request
+
+    return Request(session=requests.Session())
+
+
+def _refresh_credentials(credentials: Credentials) -> None:
+    """Mint a new access token for the credentials (sync, for executor).
+
+    Validity is checked again here because a queued refresh may find the token
+    already renewed by the one before it.
+    """
+    if not credentials.valid:
+        credentials.refresh(_auth_request())
+
+
+def _intern_row(row: list[Any]) -> tuple[Any, ...]:
+    """Freeze a row, interning its strings.
+
+    Symbols, currencies and account names repeat on every row; interning
+    keeps one copy of each in the cached data.
+    """
+    return tuple(sys.intern(cell) if type(cell) is str else cell for cell in row)
+
+
+def _retry_delay(retry_after: str | None, attempt: int) -> float:
+    """Return how long to wait before retrying a throttled or failed request."""
+    if retry_after is not None and retry_after.isdigit():
+        return min(float(retry_after), SHEETS_RETRY_MAX_DELAY)
+    return min(random.random() * 2 ** (attempt + 1), SHEETS_RETRY_MAX_DELAY)
 
 
 class GoogleSheetsAPI:
-    """Google Sheets API client using service account credentials."""
+    """Google Sheets API client using service account credentials.
+
+    Requests go straight to the Sheets REST API over Home Assistant's shared
+    aiohttp session; only credential loading and token refreshes block, and
+    those run in a dedicated executor.
+    """
+
+    __slots__ = (
+        "hass",
+        "config_entry",
+        "_session",
+        "_credentials",
+        "_data_cache",
+        "_pending_fetches",
+        "_etags",
+        "_executor",
+    )
 
     def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
         """Initialize the Google Sheets API client."""
         self.hass = hass
         self.config_entry = config_entry
-        self._service = None
+        # Shared, pooled session: connections are kept alive between requests
+        self._session = async_get_clientsession(hass)
         self._credentials = None
+        # (spreadsheet_id, ranges) -> (monotonic fetch time, value ranges)
+        self._data_cache: dict[tuple[str, tuple[str, ...]], tuple[float, List[SheetRows]]] = {}
+        self._pending_fetches: dict[tuple[str, tuple[str, ...]], asyncio.Task] = {}
+        # (url, query) -> (ETag, body) for conditional requests
+        self._etags: dict[tuple[str, tuple[tuple[str, str], ...]], tuple[str, dict[str, Any]]] = {}
+        # Credential parsing and token refreshes get their own worker so a slow
+        # Google token endpoint cannot hold up Home Assistant's shared executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"portfolio_sheets_{config_entry.entry_id[:8]}"
+        )
 
-    async def async_get_service(self):
-        """Get or create the Google Sheets service using service account credentials."""
-        if self._service is None:
-            try:
-                # Get credentials from config entry
-                credentials_json = self.config_entry.data.get(CONF_GOOGLE_CREDENTIALS_JSON)
-                
-                if not credentials_json:
-                    _LOGGER.warning("No Google credentials configured. Google Sheets functionality disabled.")
-                    return None
-                
-                # Parse credentials JSON
-                try:
-                    credentials_data = json.loads(credentials_json)
-                except json.JSONDecodeError as e:
-                    _LOGGER.error("Invalid Google credentials JSON format: %s", e)
-                    return None
-                
-                # Create service account credentials
-                if "type" in credentials_data and credentials_data["type"] == "service_account":
-                    _LOGGER.debug("Using service account credentials")
-                    credentials = Credentials.from_service_account_info(
-                        credentials_data, scopes=SCOPES
-                    )
-                else:
-                    _LOGGER.error("Only service account credentials are supported")
-                    return None
-                
-                # Build the service with error handling
-                try:
-                    self._service = await self.hass.async_add_executor_job(
-                        build, "sheets", "v4", credentials=credentials
-                    )
-                    _LOGGER.info("Google Sheets API service initialized successfully")
-                except Exception as e:
-                    _LOGGER.error("Failed to build Google Sheets API service: %s", e)
-                    return None
-                self._credentials = credentials
-                
-                _LOGGER.info("Successfully connected to Google Sheets API using service account")
-                
-            except Exception as e:
-                _LOGGER.error(f"Failed to connect to Google Sheets API: {e}")
-                return None
-                
-        return self._service
+    async def _async_run_in_executor(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking Google auth call in the dedicated Sheets executor."""
+        return await self.hass.loop.run_in_executor(self._executor, func, *args)
 
-    async def async_get_sheet_data(
-        self, 
-        spreadsheet_id: str, 
-        range_name: str = "Sheet1!A1:Z1000"
-    ) -> Optional[List[List[str]]]:
-        """Get data from Google Sheets."""
-        try:
-            service = await self.async_get_service()
-            if service is None:
-                return None
+    async def async_setup(self) -> bool:
+        """Load the service account credentials from the config entry.
+
+        Called once when the entry is set up, so requests only need to check
+        that credentials are present. Returns False when they are unusable.
+        """
+        credentials_json = self.config_entry.data.get(CONF_GOOGLE_CREDENTIALS_JSON)
+        if not credentials_json:
+            _LOGGER.warning("No Google credentials configured. Google Sheets functionality disabled.")
+            return False
 
-            # Execute the request
-            result = await self.hass.async_add_executor_job(
-                self._get_values, service, spreadsheet_id, range_name
+        try:
+            self._credentials = await self._async_run_in_executor(
+                _service_account_credentials, credentials_json
             )
-            
-            if result is None:
-                return None
-                
-            values = result.get("values", [])
-            _LOGGER.debug(f"Retrieved {len(values)} rows from Google Sheets")
-            return values
-            
-        except HttpError as e:
-            _LOGGER.error(f"Google Sheets API error: {e}")
+        except (ValueError, ImportError) as e:
+            _LOGGER.error("Failed to load Google service account credentials: %s", e)
+            return False
+
+        _LOGGER.info("Google Sheets API credentials loaded for service account")
+        return True
+
+    async def _async_get_access_token(self) -> Optional[str]:
+        """Return a valid OAuth access token, refreshing it when needed."""
+        credentials = self._credentials
+        if credentials is None:
             return None
+
+        if not credentials.valid:
+            await self._async_run_in_executor(_refresh_credentials, credentials)
+        return credentials.token
+
+    async def async_prefetch_token(self) -> None:
+        """Mint the first access token so the first request does not wait for it."""
+        try:
+            await self._async_get_access_token()
         except Exception as e:
-            _LOGGER.error(f"Unexpected error getting sheet data: {e}")
+            _LOGGER.debug("Google access token prefetch failed: %s", e)
+
+    async def _async_get_json(
+        self, url: str, params: list[tuple[str, str]], conditional: bool = False
+    ) -> Optional[dict[str, Any]]:
+        """GET a Sheets API resource and return the decoded JSON body.
+
+        With conditional=True the last ETag for this URL and query is sent as
+        If-None-Match, and a 304 Not Modified reply returns the stored body.
+
+        Throttled (429) and server error responses are retried with backoff;
+        other HTTP errors raise aiohttp.ClientResponseError.
+        """
+        access_token = await self._async_get_access_token()
+        if access_token is None:
             return None
 
-    def _get_values(self, service, spreadsheet_id: str, range_name: str):
-        """Sync method to get values from Google Sheets."""
-        try:
-            result = (
-                service.spreadsheets()
-                .values()
-                .get(spreadsheetId=spreadsheet_id, range=range_name)
-                .execute()
+        headers = {**SHEETS_REQUEST_HEADERS, "Authorization": f"Bearer {access_token}"}
+        etag_key = (url, tuple(params))
+        validator = self._etags.get(etag_key) if conditional else None
+        if validator is not None:
+            headers["If-None-Match"] = validator[0]
+        
+        for attempt in range(SHEETS_REQUEST_RETRIES + 1):
+            async with self._session.get(
+                url, params=params, headers=headers, timeout=SHEETS_REQUEST_TIMEOUT
+            ) as response:
+                if response.status == 304 and validator is not None:
+                    return validator[1]
+                if (
+                    response.status not in SHEETS_RETRY_STATUSES
+                    or attempt == SHEETS_REQUEST_RETRIES
+                ):
+                    response.raise_for_status()
+                    body = await response.json(loads=json_loads)
+                    if conditional and (etag := response.headers.get("ETag")):
+                        self._etags[etag_key] = (etag, body)
+                    return body
+                delay = _retry_delay(response.headers.get("Retry-After"), attempt)
+
+            _LOGGER.debug(
+                "Sheets API returned %s, retrying in %.1f seconds", response.status, delay
             )
-            return result
-        except Exception as e:
-            _LOGGER.error(f"Error executing sheets request: {e}")
+            await asyncio.sleep(delay)
+        return None
+
+    async def async_get_sheet_data(
+        self,
+        spreadsheet_id: str,
+        range_name: str = "Sheet1!A1:Z1000"
+    ) -> Optional[SheetRows]:
+        """Get data from a single range of a Google Sheet."""
+        value_ranges = await self.async_get_sheet_data_batch(spreadsheet_id, [range_name])
+        if value_ranges is None:
             return None
+        return value_ranges[0] if value_ranges else ()
 
-    async def async_test_connection(self, spreadsheet_id: str) -> bool:
-        """Test connection to Google Sheets."""
-        try:
-            service = await self.async_get_service()
-            if service is None:
-                return False
+    async def async_get_sheet_data_batch(
+        self,
+        spreadsheet_id: str,
+        ranges: List[str],
+    ) -> Optional[List[SheetRows]]:
+        """Get data for several ranges of a Google Sheet in one request.
+
+        Returns the rows of each range in the order the ranges were given.
+        Cells are unformatted, so numbers arrive as numbers rather than
+        locale-formatted strings.
 
-            # Try to get spreadsheet metadata
-            result = await self.hass.async_add_executor_job(
-                self._get_spreadsheet_metadata, service, spreadsheet_id
+        Results are reused for SHEETS_DATA_CACHE_TTL seconds, and concurrent
+        callers asking for the same ranges share a single request.
+        """
+        key = (spreadsheet_id, tuple(ranges))
+        cached = self._data_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < SHEETS_DATA_CACHE_TTL:
+            return cached[1]
+        
+        pending = self._pending_fetches.get(key)
+        if pending is None:
+            pending = self.hass.async_create_task(
+                self._async_fetch_value_ranges(spreadsheet_id, ranges),
+                f"{DOMAIN}_sheets_fetch",
             )
-            
-            return result is not None
-            
-        except Exception as e:
-            _LOGGER.error(f"Google Sheets connection test failed: {e}")
-            return False
+            self._pending_fetches[key] = pending
+            pending.add_done_callback(lambda _: self._pending_fetches.pop(key, None))
+        # Shield so one cancelled caller does not cancel the fetch for the others
+        return await asyncio.shield(pending)
 
-    def _get_spreadsheet_metadata(self, service, spreadsheet_id: str):
-        """Get spreadsheet metadata to test connection."""
+    async def _async_fetch_value_ranges(
+        self,
+        spreadsheet_id: str,
+        ranges: List[str],
+    ) -> Optional[List[SheetRows]]:
+        """Fetch several ranges with values:batchGet and cache the result."""
+        params = [("ranges", range_name) for range_name in ranges]
+        params += [
+            ("majorDimension", "ROWS"),
+            ("valueRenderOption", "UNFORMATTED_VALUE"),
+            ("dateTimeRenderOption", "SERIAL_NUMBER"),
+            ("fields", "valueRanges(values)"),
+        ]
         try:
-            result = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-            return result
+            result = await self._async_get_json(
+                f"{SHEETS_API_URL}/{spreadsheet_id}/values:batchGet", params, conditional=True
+            )
         except Exception as e:
-            _LOGGER.error(f"Error getting spreadsheet metadata: {e}")
+            _LOGGER.error("Error getting sheet data: %s", e)
+            result = None
+
+        if result is None:
             return None
 
+        value_ranges = []
+        for value_range in result.get("valueRanges", ()):
+            try:
+                value_ranges.append(tuple(map(_intern_row, value_range["values"])))
+            except KeyError:
+                # Empty ranges come back without a "values" key
+                value_ranges.append(())
+        _LOGGER.debug(
+            "Retrieved %s rows from Google Sheets",
+            [len(values) for values in value_ranges],
+        )
+        self._data_cache[(spreadsheet_id, tuple(ranges))] = (time.monotonic(), value_ranges)
+        return value_ranges
+
+    def close(self) -> None:
+        """Drop the cached credentials and stop the executor.
+
+        The module-level credentials cache is cleared too, so private keys of
+        removed entries or rotated keys are not kept; other entries keep the
+        Credentials they already hold. The aiohttp session is shared by Home
+        Assistant and is not closed here.
+        """
+        self._credentials = None
+        _service_account_credentials.cache_clear()
+        self._data_cache.clear()
+        self._etags.clear()
+        self._executor.shutdown(wait=False)
+
     async def async_get_connection_status(self) -> str:
-        """Get current connection status."""
-        try:
-            service = await self.async_get_service()
-            return "connected" if service is not None else "disconnected"
-        except Exception:
-            return "disconnected"
+        """Get current connection status without making a request."""
+        return "connected" if self._credentials is not None else "disconnected"
 
 
 class GoogleAPIError(Exception):
     """Exception raised for Google API errors."""
-    pass
\ No newline at end of file
+    pass
@@ -1,9 +1,17 @@
 """Portfolio Manager for Home Assistant integration - InfluxDB v1 for HA Add-on."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any
+from itertools import islice
+from typing import Any, Callable, TypeVar
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
@@ -14,16 +22,95 @@ from .const import (
     CONF_INFLUXDB_USERNAME,
     CONF_INFLUXDB_PASSWORD,
     CONF_INFLUXDB_DATABASE,
+    CONF_INFLUXDB_UDP_PORT,
     CONF_GOOGLE_SHEETS_ID,
     CONF_GOOGLE_CREDENTIALS_JSON,
+    COLUMN_ALIAS_TO_CANONICAL,
     DEFAULT_COLUMN_MAPPING,
     ERROR_CODES,
+    INFLUXDB_HEALTH_MAX_AGE,
+    PORTFOLIO_DATA_CACHE_TTL,
+    SYSTEM_STATUS_CACHE_TTL,
 )
 from .utils import parse_influxdb_url
 from .google_api import GoogleSheetsAPI
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# InfluxDB calls get their own small pool so they neither starve nor are
+# starved by other integrations sharing Home Assistant's default executor
+INFLUXDB_EXECUTOR_WORKERS = 4
+
+# Ranges read from Google Sheets on each sync, fetched in a single batchGet;
+# the first is the positions table (based on your portfolio_config.yaml)
+SHEETS_SYNC_RANGES = ["historia!A1:E3000"]
+
+# Portfolio reads: total value, the two most recent non-empty daily values
+# (newest first) for the daily change, and each position's latest fields,
+# sent as one multi-statement query
+PORTFOLIO_QUERY = "; ".join((
+    'SELECT last("total_value") FROM "portfolio"',
+    'SELECT last("total_value") FROM "portfolio" WHERE time > now() - 3d '
+    'GROUP BY time(1d) fill(none) ORDER BY time DESC LIMIT 2',
+    'SELECT last("value"), last("quantity"), last("change") FROM "positions" GROUP BY "symbol"',
+))
+
+# Google Sheets -> InfluxDB writes are queued and flushed by background workers
+WRITE_QUEUE_SIZE = 100
+WRITE_WORKERS = 2
+WRITE_BATCH_SIZE = 5000
+# UDP writes must fit a datagram (InfluxDB's default UDP payload size is 64 KiB)
+WRITE_UDP_BATCH_SIZE = 400
+# A worker writes once this many points are pending, or once the oldest
+# pending batch has waited WRITE_FLUSH_INTERVAL seconds
+WRITE_FLUSH_POINTS = 100
+WRITE_FLUSH_INTERVAL = 1.0
+
+# Analytics trend strength by absolute percent change, strongest first
+TREND_STRENGTH_THRESHOLDS = ((10, "strong"), (5, "moderate"))
+
+# Tag values are escaped per the InfluxDB line protocol, as the influxdb
+# client's own escaping does; translate() maps each character once, so the
+# backslash escape does not apply to the others
+_TAG_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\n": "\\n", ",": r"\,", " ": r"\ ", "=": r"\="}
+)
+
+
+def _trend_strength(percent_change: float) -> str:
+    """Classify the size of a percentage change using TREND_STRENGTH_THRESHOLDS."""
+    magnitude = abs(percent_change)
+    return next(
+        (label for threshold, label in TREND_STRENGTH_THRESHOLDS if magnitude > threshold),
+        "weak",
+    )
+
+
+def _cell_value(row: Sequence[Any], index: int | None) -> str | float | None:
+    """Return a cell from a Sheets row, or None if its column is unmapped or it is blank.
+
+    Numeric cells arrive unformatted from the Sheets API and are returned as
+    numbers instead of being round-tripped through str().
+    """
+    if index is None:
+        return None
+    cell = row[index]
+    if type(cell) in (int, float):
+        return cell
+    cell = str(cell).strip()
+    return cell or None
+
+
+def _cell_float(row: Sequence[Any], index: int | None, default: float = 0.0) -> float:
+    """Return a Sheets cell as a float, or default if it is unmapped or blank.
+
+    Only a missing cell falls back; an explicit 0 is kept.
+    """
+    cell = _cell_value(row, index)
+    return default if cell is None else float(cell)
+
 
 class PortfolioManager:
     """Manages portfolio data collection and analysis for Home Assistant - InfluxDB v1."""
@@ -33,6 +120,12 @@ class PortfolioManager:
         self.hass = hass
         self.config = config
         self.config_entry = config_entry
+        # Connection settings are normalised once; client re-creation after a
+        # connection failure reuses them
+        self._influx_username = config.get(CONF_INFLUXDB_USERNAME, "").strip()
+        self._influx_password = config.get(CONF_INFLUXDB_PASSWORD, "").strip()
+        self._database = config.get(CONF_INFLUXDB_DATABASE, "portfolio").strip()
+        self._udp_port = config.get(CONF_INFLUXDB_UDP_PORT)
         self._google_api = None
         
         # Initialize Google Sheets API if configured with both sheets ID and credentials
@@ -55,55 +148,189 @@ class PortfolioManager:
                 _LOGGER.debug("Google Sheets not configured. Integration will work with InfluxDB data only.")
             self._google_api = None
         self._influx_client = None
+        self._influx_client_lock = threading.Lock()
         self._last_data = None
+        self._last_data_time = 0.0
+        # Reads started before the latest write must not be cached
+        self._last_write_time = float("-inf")
+        self._last_status: dict[str, Any] | None = None
+        self._last_status_time = 0.0
+        # Outcome of the latest InfluxDB query or probe, for the system status
+        self._influxdb_healthy = False
+        self._influxdb_checked = float("-inf")
+        thread_prefix = f"portfolio_{config_entry.entry_id[:8]}" if config_entry else "portfolio_influx"
+        self._executor = ThreadPoolExecutor(
+            max_workers=INFLUXDB_EXECUTOR_WORKERS, thread_name_prefix=thread_prefix
+        )
+        self._write_queue: asyncio.Queue[list[str]] = asyncio.Queue(
+            maxsize=WRITE_QUEUE_SIZE
+        )
+        self._write_workers: list[asyncio.Task] = []
+        # Coalescing waits of the write workers, cut short by async_flush
+        self._coalesce_timeouts: set[asyncio.Timeout] = set()
+        self._flush_waiters = 0
+        # Latest write failure not yet reported by async_flush
+        self._write_error: Exception | None = None
 
-    def _get_influx_client(self):
-        """Get or create InfluxDB v1 client with improved error handling."""
-        if self._influx_client is None:
-            try:
-                from influxdb import InfluxDBClient
-                
-            except ImportError as e:
-                _LOGGER.error("InfluxDB client not available. Please install influxdb package with: pip install influxdb>=5.3.0,<7.0.0")
-                _LOGGER.error("Import error details: %s", e)
-                raise HomeAssistantError("InfluxDB client library not found. Please install 'influxdb' package.") from e
-            
-            try:
-                # Extract and validate credentials
-                username = self.config.get(CONF_INFLUXDB_USERNAME, "").strip()
-                password = self.config.get(CONF_INFLUXDB_PASSWORD, "").strip()
-                database = self.config.get(CONF_INFLUXDB_DATABASE, "portfolio").strip()
-                
-                if not username or not password:
-                    raise HomeAssistantError("InfluxDB username and password are required")
-                
-                _LOGGER.debug("Creating InfluxDB v1 client for %s", self.config[CONF_INFLUXDB_URL])
-                
-                # Parse URL to get host and port
-                url = self.config[CONF_INFLUXDB_URL]
-                host, port, ssl = parse_influxdb_url(url)
-                
-                # Create client with improved settings
-                self._influx_client = InfluxDBClient(
-                    host=host,
-                    port=port,
-                    username=username,
-                    password=password,
-                    database=database,
-                    ssl=ssl,
-                    verify_ssl=ssl,
-                    timeout=30,
-                    retries=3
+    async def async_setup(self) -> None:
+        """Load Google Sheets credentials once, ahead of the first sync.
+
+        The first access token is then fetched in the background, alongside
+        the rest of Home Assistant's startup.
+        """
+        if not self._google_api:
+            return
+        if not await self._google_api.async_setup():
+            _LOGGER.warning("Google Sheets credentials could not be loaded. Google Sheets sync disabled.")
+            return
+        self.hass.async_create_background_task(
+            self._google_api.async_prefetch_token(),
+            name="portfolio_tracker_sheets_token_prefetch",
+        )
+
+    async def _async_run_in_executor(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking InfluxDB call in the integration's dedicated executor."""
+        return await self.hass.loop.run_in_executor(self._executor, func, *args)
+
+    def async_start_writers(self) -> None:
+        """Start the background workers that flush queued points to InfluxDB."""
+        for index in range(WRITE_WORKERS):
+            self._write_workers.append(
+                self.hass.async_create_background_task(
+                    self._async_write_worker(), name=f"portfolio_tracker_writer_{index}"
                 )
-                
-                _LOGGER.debug("InfluxDB v1 client created successfully")
-                    
+            )
+
+    async def _async_write_worker(self) -> None:
+        """Write queued point batches to InfluxDB until cancelled.
+
+        Batches arriving close together are combined into one write, flushed
+        by size (WRITE_FLUSH_POINTS) or age (WRITE_FLUSH_INTERVAL). A pending
+        async_flush ends the wait early.
+        """
+        loop = self.hass.loop
+        while True:
+            points = list(await self._write_queue.get())
+            batches = 1
+            deadline = loop.time() + WRITE_FLUSH_INTERVAL
+            try:
+                while len(points) < WRITE_FLUSH_POINTS and not self._flush_waiters:
+                    try:
+                        async with asyncio.timeout_at(deadline) as timeout:
+                            self._coalesce_timeouts.add(timeout)
+                            try:
+                                points.extend(await self._write_queue.get())
+                            finally:
+                                self._coalesce_timeouts.discard(timeout)
+                    except TimeoutError:
+                        break
+                    batches += 1
+                await self._async_run_in_executor(self._write_points, points)
             except Exception as e:
-                _LOGGER.error("Failed to create InfluxDB v1 client: %s", e)
-                self._influx_client = None
-                raise HomeAssistantError(f"InfluxDB v1 connection failed: {e}") from e
+                _LOGGER.error("Failed to write data to InfluxDB: %s", e)
+                self._write_error = e
+            finally:
+                for _ in range(batches):
+                    self._write_queue.task_done()
+
+    async def async_flush(self) -> None:
+        """Wait until every queued point batch has been written.
+
+        Raises HomeAssistantError if a write failed since the last flush.
+        """
+        self._flush_waiters += 1
+        try:
+            # Workers holding a batch back for coalescing write it now; a
+            # timeout already at its deadline is expiring and cannot be changed
+            now = self.hass.loop.time()
+            for timeout in self._coalesce_timeouts:
+                if not timeout.expired() and timeout.when() > now:
+                    timeout.reschedule(now)
+            await self._write_queue.join()
+        finally:
+            self._flush_waiters -= 1
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise HomeAssistantError(f"Failed to write data to InfluxDB: {error}") from error
+
+    def shutdown(self) -> None:
+        """Stop the write workers and release executor threads and connections."""
+        for task in self._write_workers:
+            task.cancel()
+        self._write_workers.clear()
+        self._executor.shutdown(wait=False)
+        if self._google_api:
+            self._google_api.close()
+
+    def _get_influx_client(self):
+        """Get or create the shared InfluxDB v1 client.
+
+        Service calls and coordinator updates run concurrently on the executor,
+        so creation is guarded by a lock to hand every caller the same client.
+        """
+        client = self._influx_client
+        if client is not None:
+            return client
+        
+        with self._influx_client_lock:
+            if self._influx_client is None:
+                self._influx_client = self._create_influx_client()
+            return self._influx_client
+
+    def _create_influx_client(self):
+        """Create InfluxDB v1 client with improved error handling."""
+        try:
+            from influxdb import InfluxDBClient
+            
+        except ImportError as e:
+            _LOGGER.error("InfluxDB client not available. Please install influxdb package with: pip install influxdb>=5.3.0,<7.0.0")
+            _LOGGER.error("Import error details: %s", e)
+            raise HomeAssistantError("InfluxDB client library not found. Please install 'influxdb' package.") from e
+        
+        try:
+            # Validate credentials
+            if not self._influx_username or not self._influx_password:
+                raise HomeAssistantError("InfluxDB username and password are required")
+            
+            _LOGGER.debug("Creating InfluxDB v1 client for %s", self.config[CONF_INFLUXDB_URL])
+            
+            # Parse URL to get host and port
+            url = self.config[CONF_INFLUXDB_URL]
+            host, port, ssl = parse_influxdb_url(url)
+            
+            # With a UDP port configured, writes skip HTTP; queries still use it
+            udp_options = (
+                {"use_udp": True, "udp_port": self._udp_port} if self._udp_port else {}
+            )
+            
+            # Create client with improved settings
+            client = InfluxDBClient(
+                host=host,
+                port=port,
+                username=self._influx_username,
+                password=self._influx_password,
+                database=self._database,
+                ssl=ssl,
+                verify_ssl=ssl,
+                timeout=30,
+                retries=3,
+                # One pooled keep-alive connection per executor worker
+                pool_size=INFLUXDB_EXECUTOR_WORKERS,
+                # Compress write bodies and ask for compressed query responses
+                gzip=True,
+                **udp_options,
+            )
+            
+            _LOGGER.debug("InfluxDB v1 client created successfully")
+            return client
                 
-        return self._influx_client
+        except Exception as e:
+            _LOGGER.error("Failed to create InfluxDB v1 client: %s", e)
+            raise HomeAssistantError(f"InfluxDB v1 connection failed: {e}") from e
+
+    async def async_test_connection(self) -> bool:
+        """Test connection to InfluxDB v1 without blocking the event loop."""
+        return await self._async_run_in_executor(self.test_connection)
 
     def test_connection(self) -> bool:
         """Test connection to InfluxDB v1 with improved error handling."""
@@ -124,7 +351,7 @@ class PortfolioManager:
                     _LOGGER.debug("Ping attempt %d failed, retrying: %s", attempt + 1, ping_error)
             
             # Test database access
-            database = self.config.get(CONF_INFLUXDB_DATABASE, "portfolio")
+            database = self._database
             try:
                 databases = client.get_list_database()
                 db_names = [db['name'] for db in databases]
@@ -145,8 +372,10 @@ class PortfolioManager:
             
         except Exception as e:
             _LOGGER.error("Connection test failed: %s", e)
-            # Reset client on connection failure
-            self._influx_client = None
+            # Only a transport failure warrants a new client; keep the pooled
+            # connections for errors the server reported itself
+            if isinstance(e, RequestsConnectionError):
+                self._influx_client = None
             raise HomeAssistantError(f"Cannot connect to InfluxDB v1: {e}") from e
 
     async def async_get_google_sheets_data(self) -> dict[str, Any]:
@@ -159,23 +388,22 @@ class PortfolioManager:
             if not sheets_id:
                 return {"connected": False, "data": []}
                 
-            # Test connection first
-            connected = await self._google_api.async_test_connection(sheets_id)
-            if not connected:
+            # Get data from the sheet (assuming 'historia' sheet as per your config).
+            # A successful read proves the connection, so no separate test request.
+            value_ranges = await self._google_api.async_get_sheet_data_batch(
+                sheets_id, SHEETS_SYNC_RANGES
+            )
+            if value_ranges is None:
                 return {"connected": False, "data": []}
-                
-            # Get data from the sheet (assuming 'historia' sheet as per your config)
-            range_name = "historia!A1:E3000"  # Based on your portfolio_config.yaml
-            data = await self._google_api.async_get_sheet_data(sheets_id, range_name)
             
             return {
                 "connected": True,
-                "data": data or [],
+                "data": value_ranges[0] if value_ranges else [],
                 "last_access": datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
-            _LOGGER.error(f"Error getting Google Sheets data: {e}")
+            _LOGGER.error("Error getting Google Sheets data: %s", e)
             return {"connected": False, "data": [], "error": str(e)}
 
     async def async_get_google_sheets_status(self) -> str:
@@ -192,11 +420,30 @@ class PortfolioManager:
             _LOGGER.debug("Google Sheets status check failed: %s", e)
             return "disconnected"
 
+    async def async_get_portfolio_data(self) -> dict[str, Any]:
+        """Get current portfolio data from InfluxDB v1 without blocking the event loop."""
+        return await self._async_run_in_executor(self.get_portfolio_data)
+
     def get_portfolio_data(self) -> dict[str, Any]:
-        """Get current portfolio data from InfluxDB v1."""
+        """Get current portfolio data from InfluxDB v1.
+
+        Successful reads are reused for PORTFOLIO_DATA_CACHE_TTL seconds so
+        callers polling close together share one query. A write invalidates
+        the cached read.
+        """
+        if (
+            self._last_data is not None
+            and self._last_data_time > self._last_write_time
+            and time.monotonic() - self._last_data_time < PORTFOLIO_DATA_CACHE_TTL
+        ):
+            return self._last_data
+
+        # Taken before querying, so a write landing mid-query is not masked
+        started = time.monotonic()
+        query_succeeded = False
         try:
             client = self._get_influx_client()
-            database = self.config.get(CONF_INFLUXDB_DATABASE, "portfolio")
+            database = self._database
             
             # Initialize default data structure
             portfolio_data = {
@@ -212,48 +459,31 @@ class PortfolioManager:
                 }
             }
             
-            # Test InfluxDB connectivity
-            try:
-                client.ping()
-                portfolio_data['data_sources']['influxdb_connected'] = True
-            except Exception:
-                portfolio_data['data_sources']['influxdb_connected'] = False
-            
             # Try to query actual portfolio data
             try:
-                # Query for portfolio total value
-                value_query = 'SELECT last("total_value") FROM "portfolio"'
-                _LOGGER.debug("Executing portfolio value query: %s", value_query)
+                # All statements go in one request; results come back in statement order
+                _LOGGER.debug("Executing portfolio queries: %s", PORTFOLIO_QUERY)
+                value_result, change_result, positions_result = client.query(
+                    PORTFOLIO_QUERY, database=database
+                )
+                # A successful query proves connectivity; no separate ping
+                portfolio_data['data_sources']['influxdb_connected'] = True
+                self._set_influxdb_health(True)
                 
-                result = client.query(value_query, database=database)
-                points = list(result.get_points())
+                # Only the first point is needed; get_points() is a generator
+                point = next(value_result.get_points(), None)
                 
-                if points:
-                    value = points[0].get('last')
+                if point is not None:
+                    value = point.get('last')
                     if value is not None:
                         portfolio_data['portfolio_value'] = float(value)
                         _LOGGER.debug("Found portfolio value: %s", value)
                 
-                # Query for daily change (compare last 2 daily values)
-                change_query = '''
-                SELECT last("total_value") 
-                FROM "portfolio" 
-                WHERE time > now() - 2d 
-                GROUP BY time(1d)
-                '''
-                
-                _LOGGER.debug("Executing daily change query")
-                change_result = client.query(change_query, database=database)
-                
-                values = []
-                for point in change_result.get_points():
-                    value = point.get('last')
-                    if value is not None:
-                        values.append(float(value))
+                # fill(none) drops empty days, so both rows carry a value
+                values = [float(point['last']) for point in change_result.get_points()]
                 
                 if len(values) >= 2:
-                    current_value = values[-1]
-                    previous_value = values[-2]
+                    current_value, previous_value = values
                     daily_change = current_value - previous_value
                     daily_change_percent = (daily_change / previous_value * 100) if previous_value > 0 else 0.0
                     
@@ -262,23 +492,12 @@ class PortfolioManager:
                     
                     _LOGGER.debug("Daily change calculated: %s (%.2f%%)", daily_change, daily_change_percent)
                 
-                # Query for individual positions
-                positions_query = '''
-                SELECT last("value"), last("quantity"), last("change") 
-                FROM "positions" 
-                GROUP BY "symbol"
-                '''
-                
-                _LOGGER.debug("Executing positions query")
-                positions_result = client.query(positions_query, database=database)
-                
                 positions = []
-                for series in positions_result:
-                    symbol = series.get('tags', {}).get('symbol', 'Unknown')
-                    points = list(series.get('points', []))
+                for (_, tags), series_points in positions_result.items():
+                    symbol = (tags or {}).get('symbol', 'Unknown')
+                    point = next(series_points, None)
                     
-                    if points:
-                        point = points[0]
+                    if point is not None:
                         position = {
                             'symbol': symbol,
                             'value': float(point.get('last', 0)) if point.get('last') else 0.0,
@@ -291,9 +510,11 @@ class PortfolioManager:
                 portfolio_data['total_positions'] = len(positions)
                 
                 _LOGGER.debug("Found %d positions", len(positions))
+                query_succeeded = True
             
             except Exception as e:
                 _LOGGER.warning("Failed to query portfolio data, using defaults: %s", e)
+                self._set_influxdb_health(False)
             
             # Check Google Sheets connectivity if configured
             if self.config.get(CONF_GOOGLE_SHEETS_ID) and self._google_api:
@@ -309,8 +530,10 @@ class PortfolioManager:
                 # No Google Sheets configuration
                 portfolio_data['data_sources']['google_sheets_connected'] = False
             
-            # Store for future reference
-            self._last_data = portfolio_data
+            # Store for future reference; failed reads are never cached
+            if query_succeeded and started > self._last_write_time:
+                self._last_data = portfolio_data
+                self._last_data_time = started
             return portfolio_data
             
         except Exception as e:
@@ -351,82 +574,97 @@ class PortfolioManager:
                 _LOGGER.warning("Failed to fetch data from Google Sheets")
                 return False
             
-            # Process and write to InfluxDB
-            success = await self.hass.async_add_executor_job(
-                self._write_sheets_data_to_influx, sheets_data["data"]
+            # Convert rows to points, then hand them to the write workers so the
+            # caller does not wait on the InfluxDB write
+            points = await self._async_run_in_executor(
+                self._sheets_data_to_points, sheets_data["data"]
             )
             
-            if success:
-                _LOGGER.info("Successfully updated InfluxDB with Google Sheets data")
-            else:
-                _LOGGER.error("Failed to write Google Sheets data to InfluxDB")
-                
-            return success
+            if not points:
+                _LOGGER.error("No Google Sheets data to write to InfluxDB")
+                return False
+            
+            await self._write_queue.put(points)
+            _LOGGER.debug("Queued %d points for InfluxDB", len(points))
+            return True
             
         except Exception as e:
             _LOGGER.error("Failed to update portfolio data from Google Sheets: %s", e)
             return False
 
-    def _write_sheets_data_to_influx(self, sheets_data: list) -> bool:
-        """Write Google Sheets data to InfluxDB (sync method for executor) with flexible column mapping."""
+    def _write_points(self, points: list[str]) -> None:
+        """Write a batch of line protocol points to InfluxDB (sync method for executor)."""
+        client = self._get_influx_client()
+        database = self._database
+        client.write_points(
+            points,
+            database=database,
+            batch_size=WRITE_UDP_BATCH_SIZE if self._udp_port else WRITE_BATCH_SIZE,
+            protocol="line",
+        )
+        # The next read must see the new points
+        self._last_write_time = time.monotonic()
+        _LOGGER.info("Written %d points to InfluxDB", len(points))
+
+    def _sheets_data_to_points(self, sheets_data: Sequence[Sequence[Any]]) -> list[str]:
+        """Convert Google Sheets rows to InfluxDB points (sync method for executor) with flexible column mapping.
+
+        Points are formatted as line protocol, so the InfluxDB client writes
+        them as-is instead of building and serialising a dict per point.
+        """
         try:
-            client = self._get_influx_client()
-            database = self.config.get(CONF_INFLUXDB_DATABASE, "portfolio")
-            
             if not sheets_data or len(sheets_data) < 2:
                 _LOGGER.warning("No valid data rows found in Google Sheets")
-                return False
+                return []
             
             # Assume first row is headers, process data rows
             headers = [str(cell).strip().lower() for cell in sheets_data[0]]
-            data_rows = sheets_data[1:]
+            # Iterate past the header without copying the rows
+            data_rows = islice(sheets_data, 1, None)
             
-            _LOGGER.debug("Processing %d data rows with headers: %s", len(data_rows), headers)
+            _LOGGER.debug("Processing %d data rows with headers: %s", len(sheets_data) - 1, headers)
             
-            # Create column mapping
+            # Create column mapping, resolved once to column positions
             column_map = self._create_column_mapping(headers)
+            symbol_col, quantity_col, price_col, value_col, change_col = (
+                headers.index(column_map[field]) if field in column_map else None
+                for field in ("symbol", "quantity", "price", "value", "change")
+            )
+            if symbol_col is None:
+                _LOGGER.warning("No symbol column found in Google Sheets headers: %s", headers)
+                return []
             
-            # Prepare data points for InfluxDB
+            # Prepare data points for InfluxDB; the whole sync shares one timestamp
             points = []
+            timestamp = time.time_ns()
             portfolio_total = 0.0
             position_count = 0
             
             for row_index, row in enumerate(data_rows):
-                if len(row) < len(headers):
-                    continue  # Skip incomplete rows
+                # Skip incomplete and blank rows before any parsing
+                if len(row) < len(headers) or not row[symbol_col]:
+                    continue
                 
                 try:
-                    # Create a dictionary from headers and row data
-                    row_data = {}
-                    for i, header in enumerate(headers):
-                        if i < len(row):
-                            row_data[header] = str(row[i]).strip()
-                    
-                    # Extract key fields using flexible column mapping
-                    symbol = self._get_mapped_value(row_data, column_map, 'symbol')
-                    quantity = float(self._get_mapped_value(row_data, column_map, 'quantity') or 0)
-                    price = float(self._get_mapped_value(row_data, column_map, 'price') or 0)
-                    value = float(self._get_mapped_value(row_data, column_map, 'value') or (quantity * price))
+                    # Extract key fields straight from their mapped columns
+                    symbol = _cell_value(row, symbol_col)
+                    if symbol is not None:
+                        symbol = str(symbol)
+                    quantity = _cell_float(row, quantity_col)
+                    price = _cell_float(row, price_col)
+                    value = _cell_float(row, value_col, quantity * price)
                     
                     if not symbol or value <= 0:
                         _LOGGER.debug("Skipping row %d: invalid symbol '%s' or value %.2f", row_index, symbol, value)
                         continue
                     
                     # Create InfluxDB point for individual position
-                    position_point = {
-                        "measurement": "positions",
-                        "tags": {
-                            "symbol": symbol.upper()
-                        },
-                        "fields": {
-                            "quantity": quantity,
-                            "price": price,
-                            "value": value,
-                            "change": float(self._get_mapped_value(row_data, column_map, 'change') or 0),
-                        },
-                        "time": datetime.now(timezone.utc).isoformat()
-                    }
-                    points.append(position_point)
+                    change = _cell_float(row, change_col)
+                    points.append(
+                        f"positions,symbol={symbol.upper().translate(_TAG_ESCAPES)} "
+                        f"quantity={quantity!r},price={price!r},value={value!r},change={change!r} "
+                        f"{timestamp}"
+                    )
                     
                     portfolio_total += value
                     position_count += 1
@@ -439,56 +677,50 @@ class PortfolioManager:
             
             # Add portfolio total point
             if portfolio_total > 0:
-                portfolio_point = {
-                    "measurement": "portfolio",
-                    "fields": {
-                        "total_value": portfolio_total,
-                        "position_count": position_count,
-                    },
-                    "time": datetime.now(timezone.utc).isoformat()
-                }
-                points.append(portfolio_point)
+                points.append(
+                    f"portfolio total_value={portfolio_total!r},position_count={position_count}i "
+                    f"{timestamp}"
+                )
             
-            # Write points to InfluxDB
             if points:
-                client.write_points(points, database=database)
-                _LOGGER.info("Written %d points to InfluxDB (portfolio value: $%.2f)", 
+                _LOGGER.debug("Prepared %d points for InfluxDB (portfolio value: $%.2f)", 
                            len(points), portfolio_total)
-                return True
             else:
                 _LOGGER.warning("No valid data points to write to InfluxDB")
-                return False
+            return points
                 
         except Exception as e:
-            _LOGGER.error("Failed to write data to InfluxDB: %s", e)
-            return False
+            _LOGGER.error("Failed to convert Google Sheets data: %s", e)
+            return []
     
     def _create_column_mapping(self, headers: list[str]) -> dict[str, str]:
         """Create a mapping from standard field names to actual column names."""
         column_map = {}
         
-        for field, possible_names in DEFAULT_COLUMN_MAPPING.items():
-            for possible_name in possible_names:
-                if possible_name in headers:
-                    column_map[field] = possible_name
-                    break
+        for header in headers:
+            field = COLUMN_ALIAS_TO_CANONICAL.get(header)
+            if field is None:
+                continue
+            current = column_map.get(field)
+            # Several aliases of one field present: the earlier alias in DEFAULT_COLUMN_MAPPING wins
+            if current is None or (
+                DEFAULT_COLUMN_MAPPING[field].index(header)
+                < DEFAULT_COLUMN_MAPPING[field].index(current)
+            ):
+                column_map[field] = header
         
         _LOGGER.debug("Column mapping created: %s", column_map)
         return column_map
     
-    def _get_mapped_value(self, row_data: dict, column_map: dict, field: str) -> str | None:
-        """Get value for a field using the column mapping."""
-        mapped_column = column_map.get(field)
-        if mapped_column and mapped_column in row_data:
-            value = row_data[mapped_column]
-            return value if value and value.strip() else None
-        return None
+    async def async_run_analytics(self, days: int = 30) -> dict[str, Any]:
+        """Run portfolio analytics without blocking the event loop."""
+        return await self._async_run_in_executor(self.run_analytics, days)
 
     def run_analytics(self, days: int = 30) -> dict[str, Any]:
         """Run portfolio analytics using InfluxDB v1."""
         try:
             client = self._get_influx_client()
-            database = self.config.get(CONF_INFLUXDB_DATABASE, "portfolio")
+            database = self._database
             
             analytics_result = {
                 'days_analyzed': days,
@@ -498,36 +730,35 @@ class PortfolioManager:
             }
             
             try:
-                # Get portfolio values over the specified period
-                analytics_query = f'''
-                SELECT mean("total_value") 
-                FROM "portfolio" 
-                WHERE time > now() - {days}d 
-                GROUP BY time(1d)
-                '''
+                # Summarise the daily mean portfolio values over the period
+                # server-side, so a single row comes back whatever the period
+                analytics_query = (
+                    'SELECT first("mean"), last("mean"), mean("mean"), '
+                    'stddev("mean"), count("mean") FROM ('
+                    'SELECT mean("total_value") FROM "portfolio" '
+                    f'WHERE time > now() - {days}d GROUP BY time(1d))'
+                )
                 
                 _LOGGER.debug("Running analytics for %d days", days)
                 result = client.query(analytics_query, database=database)
                 
-                values = []
-                for point in result.get_points():
-                    value = point.get('mean')
-                    if value is not None:
-                        values.append(float(value))
+                point = next(result.get_points(), None)
+                count = (point.get('count') or 0) if point is not None else 0
                 
-                if len(values) >= 2:
-                    start_value = values[0]
-                    end_value = values[-1]
+                if count >= 2:
+                    start_value = float(point['first'])
+                    end_value = float(point['last'])
                     total_change = end_value - start_value
                     percent_change = (total_change / start_value * 100) if start_value > 0 else 0
                     
-                    # Calculate volatility (standard deviation)
-                    if len(values) > 2:
-                        mean_value = sum(values) / len(values)
-                        variance = sum((v - mean_value) ** 2 for v in values) / len(values)
-                        volatility = variance ** 0.5
-                    else:
-                        volatility = 0
+                    # Calculate volatility (population standard deviation); InfluxDB's
+                    # stddev() is the sample deviation, so rescale it
+                    mean_value = float(point['mean'])
+                    volatility = (
+                        float(point['stddev']) * ((count - 1) / count) ** 0.5
+                        if count > 2
+                        else 0
+                    )
                     
                     analytics_result.update({
                         'analysis_complete': True,
@@ -537,11 +768,11 @@ class PortfolioManager:
                             'total_change': total_change,
                             'percent_change': percent_change,
                             'volatility': volatility,
-                            'data_points': len(values),
+                            'data_points': count,
                         },
                         'trends': {
                             'direction': 'up' if total_change > 0 else 'down' if total_change < 0 else 'flat',
-                            'trend_strength': 'strong' if abs(percent_change) > 10 else 'moderate' if abs(percent_change) > 5 else 'weak',
+                            'trend_strength': _trend_strength(percent_change),
                             'volatility_level': 'high' if volatility > mean_value * 0.1 else 'low',
                         }
                     })
@@ -561,8 +792,36 @@ class PortfolioManager:
                 'error': str(e)
             }
 
+    def _set_influxdb_health(self, healthy: bool) -> None:
+        """Record the outcome of an InfluxDB query for later status checks."""
+        self._influxdb_healthy = healthy
+        self._influxdb_checked = time.monotonic()
+
+    def _probe_influxdb(self) -> bool:
+        """Check that InfluxDB is reachable and the database exists (sync method for executor)."""
+        try:
+            # Listing databases proves both reachability and access
+            client = self._get_influx_client()
+            databases = client.get_list_database()
+            healthy = any(db['name'] == self._database for db in databases)
+        except Exception as e:
+            _LOGGER.debug("InfluxDB health check failed: %s", e)
+            healthy = False
+        self._set_influxdb_health(healthy)
+        return healthy
+
+    async def async_get_system_status(self) -> dict[str, Any]:
+        """Get portfolio system status without blocking the event loop."""
+        return await self._async_run_in_executor(self.get_system_status)
+
     def get_system_status(self) -> dict[str, Any]:
-        """Get portfolio system status."""
+        """Get portfolio system status, reusing a result within SYSTEM_STATUS_CACHE_TTL."""
+        if (
+            self._last_status is not None
+            and time.monotonic() - self._last_status_time < SYSTEM_STATUS_CACHE_TTL
+        ):
+            return self._last_status
+
         try:
             status = {
                 'system_healthy': True,
@@ -575,22 +834,13 @@ class PortfolioManager:
                 'version': 'v1-compatible',
             }
             
-            # Check InfluxDB v1
-            try:
-                client = self._get_influx_client()
-                client.ping()
-                status['components']['influxdb'] = True
-                
-                # Check database access
-                database = self.config.get(CONF_INFLUXDB_DATABASE, "portfolio")
-                databases = client.get_list_database()
-                db_names = [db['name'] for db in databases]
-                if database not in db_names:
-                    status['components']['influxdb'] = False
-                    status['system_healthy'] = False
-                    
-            except Exception as e:
-                _LOGGER.debug("InfluxDB health check failed: %s", e)
+            # Check InfluxDB v1; a recent portfolio query already answers this
+            if time.monotonic() - self._influxdb_checked < INFLUXDB_HEALTH_MAX_AGE:
+                influxdb_healthy = self._influxdb_healthy
+            else:
+                influxdb_healthy = self._probe_influxdb()
+            status['components']['influxdb'] = influxdb_healthy
+            if not influxdb_healthy:
                 status['system_healthy'] = False
             
             # Google Sheets check (if configured)
@@ -598,6 +848,10 @@ class PortfolioManager:
                 # Google Sheets health check would go here
                 status['components']['google_sheets'] = False
             
+            # Only a healthy status is cached, so recovery shows up at once
+            if influxdb_healthy:
+                self._last_status = status
+                self._last_status_time = time.monotonic()
             return status
             
         except Exception as e:
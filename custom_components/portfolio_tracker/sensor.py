@@ -1,9 +1,10 @@
 """Sensor platform for Portfolio Tracker integration."""
 from __future__ import annotations
 
-from datetime import datetime
+from collections.abc import Mapping
+from datetime import datetime, timezone
 import logging
-from typing import Any
+from typing import Any, Callable
 
 # Handle timezone imports for compatibility
 try:
@@ -13,19 +14,7 @@ except ImportError:
     try:
         from backports.zoneinfo import ZoneInfo
     except ImportError:
-        # Final fallback using datetime.timezone
-        _LOGGER.warning("zoneinfo not available, using datetime.timezone for timezone handling")
-        from datetime import timezone
-        
-        class ZoneInfo:
-            """Compatibility wrapper for timezone handling."""
-            
-            def __init__(self, tz_name: str):
-                # Simple UTC fallback
-                self._tz = timezone.utc
-            
-            def localize(self, dt):
-                return dt.replace(tzinfo=self._tz)
+        ZoneInfo = None
 
 from homeassistant.components.sensor import (
     SensorEntity,
@@ -42,9 +31,17 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, SENSOR_TYPES
 from .portfolio_manager import PortfolioManager
+from .utils import get_device_info
 
 _LOGGER = logging.getLogger(__name__)
 
+# Built once at import; constructing a ZoneInfo consults the tz database
+_UTC = ZoneInfo("UTC") if ZoneInfo is not None else timezone.utc
+
+ICON_TRENDING_UP = "mdi:trending-up"
+ICON_TRENDING_DOWN = "mdi:trending-down"
+ICON_TRENDING_NEUTRAL = "mdi:trending-neutral"
+
 SENSOR_DESCRIPTIONS: dict[str, SensorEntityDescription] = {
     "portfolio_value": SensorEntityDescription(
         key="portfolio_value",
@@ -93,19 +90,78 @@ async def async_setup_entry(
     """Set up Portfolio Tracker sensors based on a config entry."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
     portfolio_manager = hass.data[DOMAIN][config_entry.entry_id]["portfolio_manager"]
+    sw_version = hass.data[DOMAIN][config_entry.entry_id]["sw_version"]
 
-    entities = []
-    for sensor_key, description in SENSOR_DESCRIPTIONS.items():
-        entities.append(
+    async_add_entities(
+        [
             PortfolioSensor(
                 coordinator=coordinator,
                 portfolio_manager=portfolio_manager,
                 description=description,
                 config_entry_id=config_entry.entry_id,
+                sw_version=sw_version,
             )
-        )
+            for description in SENSOR_DESCRIPTIONS.values()
+        ],
+        True,
+    )
+
+
+def _attributes_portfolio_value(sensor: PortfolioSensor, data: Mapping[str, Any]) -> dict[str, Any]:
+    """Build attributes for the portfolio value sensor."""
+    attributes = {
+        "positions_count": len(data.get("positions", [])),
+        "data_sources": data.get("data_sources", {}),
+    }
+    
+    # Add top positions if available (built once per coordinator update)
+    if sensor.coordinator.top_positions:
+        attributes["top_positions"] = sensor.coordinator.top_positions
+    return attributes
+
+
+def _attributes_daily_change(sensor: PortfolioSensor, data: Mapping[str, Any]) -> dict[str, Any]:
+    """Build attributes for the daily change sensor."""
+    return {
+        "change_percent": data.get("daily_change_percent", 0.0),
+        "previous_value": data.get("previous_value", 0.0),
+    }
+
+
+def _attributes_total_positions(sensor: PortfolioSensor, data: Mapping[str, Any]) -> dict[str, Any]:
+    """Build attributes for the total positions sensor."""
+    if not sensor.coordinator.positions_view:
+        return {}
+    return {"positions": sensor.coordinator.positions_view}
+
+
+def _attributes_last_update(sensor: PortfolioSensor, data: Mapping[str, Any]) -> dict[str, Any]:
+    """Build attributes for the last update sensor."""
+    attributes = {
+        "data_sources": data.get("data_sources", {}),
+        "update_success": not data.get("error"),
+    }
+    
+    if data.get("error"):
+        attributes["error"] = data.get("error")
+    return attributes
+
 
-    async_add_entities(entities, True)
+# Per-key handlers, bound once per entity instead of branching on every state
+# read; last_update parsing keeps per-entity state, so it stays a method
+_VALUE_HANDLERS: dict[str, Callable[[Mapping[str, Any]], Any]] = {
+    "portfolio_value": lambda data: data.get("portfolio_value", 0.0),
+    "daily_change": lambda data: data.get("daily_change", 0.0),
+    "daily_change_percent": lambda data: data.get("daily_change_percent", 0.0),
+    "total_positions": lambda data: len(data.get("positions", [])),
+}
+
+_ATTRIBUTE_BUILDERS: dict[str, Callable[[PortfolioSensor, Mapping[str, Any]], dict[str, Any]]] = {
+    "portfolio_value": _attributes_portfolio_value,
+    "daily_change": _attributes_daily_change,
+    "total_positions": _attributes_total_positions,
+    "last_update": _attributes_last_update,
+}
 
 
 class PortfolioSensor(CoordinatorEntity, SensorEntity):
@@ -117,6 +173,7 @@ class PortfolioSensor(CoordinatorEntity, SensorEntity):
         portfolio_manager: PortfolioManager,
         description: SensorEntityDescription,
         config_entry_id: str,
+        sw_version: str,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -127,127 +184,72 @@ class PortfolioSensor(CoordinatorEntity, SensorEntity):
         # Set unique ID using standardized format
         self._attr_unique_id = f"{DOMAIN}_{config_entry_id}_{description.key}"
         
-        # Set device info
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, config_entry_id)},
-            "name": "Portfolio Tracker",
-            "manufacturer": "Portfolio Tracker",
-            "model": "Home Assistant Integration",
-            "sw_version": "0.1.0",
-        }
+        # Set device info (shared by all entities of this entry)
+        self._attr_device_info = get_device_info(config_entry_id, sw_version)
+        
+        # last_update only changes once per coordinator update; keep the parsed value
+        self._last_update_cache: tuple[str, datetime] | None = None
+        
+        # (coordinator data revision, attributes) of the last attribute build
+        self._attributes_cache: tuple[int, dict[str, Any] | None] | None = None
+        
+        # Bind key-specific behaviour once
+        self._value_handler = _VALUE_HANDLERS.get(description.key)
+        self._attribute_builder = _ATTRIBUTE_BUILDERS.get(description.key)
 
     @property
     def native_value(self) -> Any:
         """Return the native value of the sensor."""
-        if not self.coordinator.data:
-            return None
-
         data = self.coordinator.data
-        key = self.entity_description.key
-
-        if key == "portfolio_value":
-            return data.get("portfolio_value", 0.0)
-        elif key == "daily_change":
-            return data.get("daily_change", 0.0)
-        elif key == "daily_change_percent":
-            return data.get("daily_change_percent", 0.0)
-        elif key == "total_positions":
-            return len(data.get("positions", []))
-        elif key == "last_update":
-            last_update = data.get("last_update")
-            if last_update:
-                if isinstance(last_update, str):
-                    try:
-                        # Parse ISO string and ensure timezone info
-                        dt = datetime.fromisoformat(last_update.replace('Z', '+00:00'))
-                        # If timezone naive, assume UTC
-                        if dt.tzinfo is None:
-                            dt = dt.replace(tzinfo=ZoneInfo('UTC'))
-                        return dt
-                    except (ValueError, ImportError):
-                        # Fallback for older Python without zoneinfo
-                        try:
-                            from datetime import timezone
-                            dt = datetime.fromisoformat(last_update.replace('Z', '+00:00'))
-                            if dt.tzinfo is None:
-                                dt = dt.replace(tzinfo=timezone.utc)
-                            return dt
-                        except ValueError:
-                            return None
-                elif isinstance(last_update, datetime):
-                    # Ensure timezone info is present
-                    if last_update.tzinfo is None:
-                        try:
-                            last_update = last_update.replace(tzinfo=ZoneInfo('UTC'))
-                        except ImportError:
-                            from datetime import timezone
-                            last_update = last_update.replace(tzinfo=timezone.utc)
-                    return last_update
+        if not data:
             return None
 
+        if self._value_handler is not None:
+            return self._value_handler(data)
+        if self.entity_description.key == "last_update":
+            return self._parse_last_update(data)
+        return None
+
+    def _parse_last_update(self, data: Mapping[str, Any]) -> datetime | None:
+        """Return the last update time as a timezone-aware datetime."""
+        last_update = data.get("last_update")
+        if last_update:
+            if isinstance(last_update, str):
+                cached = self._last_update_cache
+                if cached is not None and cached[0] == last_update:
+                    return cached[1]
+                try:
+                    # Parse ISO string (a trailing "Z" is accepted) and ensure timezone info
+                    dt = datetime.fromisoformat(last_update)
+                except ValueError:
+                    return None
+                # If timezone naive, assume UTC
+                if dt.tzinfo is None:
+                    dt = dt.replace(tzinfo=_UTC)
+                self._last_update_cache = (last_update, dt)
+                return dt
+            elif isinstance(last_update, datetime):
+                # Ensure timezone info is present
+                if last_update.tzinfo is None:
+                    last_update = last_update.replace(tzinfo=_UTC)
+                return last_update
         return None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return the state attributes."""
-        if not self.coordinator.data:
+        data = self.coordinator.data
+        if not data or self._attribute_builder is None:
             return None
 
-        data = self.coordinator.data
-        key = self.entity_description.key
-
-        attributes = {}
-
-        if key == "portfolio_value":
-            attributes.update({
-                "positions_count": len(data.get("positions", [])),
-                "data_sources": data.get("data_sources", {}),
-            })
-            
-            # Add top positions if available
-            positions = data.get("positions", [])
-            if positions:
-                top_positions = sorted(positions, key=lambda x: x.get("value", 0), reverse=True)[:5]
-                attributes["top_positions"] = [
-                    {
-                        "symbol": pos.get("symbol"),
-                        "value": pos.get("value"),
-                        "change": pos.get("change"),
-                    }
-                    for pos in top_positions
-                ]
-
-        elif key == "daily_change":
-            attributes.update({
-                "change_percent": data.get("daily_change_percent", 0.0),
-                "previous_value": data.get("previous_value", 0.0),
-            })
-
-        elif key == "total_positions":
-            positions = data.get("positions", [])
-            if positions:
-                attributes.update({
-                    "positions": [
-                        {
-                            "symbol": pos.get("symbol"),
-                            "quantity": pos.get("quantity"),
-                            "value": pos.get("value"),
-                            "change": pos.get("change"),
-                        }
-                        for pos in positions
-                    ]
-                })
-
-        elif key == "last_update":
-            attributes.update({
-                "data_sources": data.get("data_sources", {}),
-                "update_success": not data.get("error"),
-            })
-            
-            if data.get("error"):
-                attributes["error"] = data.get("error")
-
-        return attributes if attributes else None
+        # Attributes only change with the data; reuse them until the next update
+        revision = self.coordinator.data_revision
+        if self._attributes_cache is not None and self._attributes_cache[0] == revision:
+            return self._attributes_cache[1]
+
+        attributes = self._attribute_builder(self, data) or None
+        self._attributes_cache = (revision, attributes)
+        return attributes
 
     @property
     def available(self) -> bool:
@@ -255,19 +257,23 @@ class PortfolioSensor(CoordinatorEntity, SensorEntity):
         return (
             self.coordinator.last_update_success
             and self.coordinator.data is not None
-            and not self.coordinator.data.get("error")
+            and self.coordinator.data_error_free
         )
 
     @property
     def icon(self) -> str | None:
         """Return the icon for the sensor."""
         if self.entity_description.key == "daily_change":
-            # Change icon based on positive/negative change
-            if self.native_value and self.native_value > 0:
-                return "mdi:trending-up"
-            elif self.native_value and self.native_value < 0:
-                return "mdi:trending-down"
-            else:
-                return "mdi:trending-neutral"
+            # Change icon based on positive/negative change; read the value
+            # directly rather than through native_value
+            data = self.coordinator.data
+            if not data:
+                return ICON_TRENDING_NEUTRAL
+            change = data.get("daily_change") or 0
+            if change > 0:
+                return ICON_TRENDING_UP
+            if change < 0:
+                return ICON_TRENDING_DOWN
+            return ICON_TRENDING_NEUTRAL
         
         return self.entity_description.icon
\ No newline at end of file
@@ -2,12 +2,30 @@
 from __future__ import annotations
 
 import logging
-from typing import Tuple
+import re
+from functools import lru_cache
+from typing import Callable, Tuple
 from urllib.parse import urlparse
 
+from homeassistant.helpers.entity import DeviceInfo
+
+from .const import DOMAIN
+
 _LOGGER = logging.getLogger(__name__)
 
+_MULTI_UNDERSCORE = re.compile(r"_+")
+# Google Sheets IDs: 40-60 alphanumeric characters, hyphens and underscores
+_SHEETS_ID_RE = re.compile(r"[A-Za-z0-9_-]{40,60}")
+# Maps every non-alphanumeric ASCII character to an underscore
+_SANITIZE_TABLE = str.maketrans({chr(i): "_" for i in range(128) if not chr(i).isalnum()})
+
+# Currencies with a symbol-prefixed format; others use "<value> <code>"
+_CURRENCY_FORMATTERS: dict[str, Callable[[float], str]] = {
+    "USD": lambda value: f"${value:,.2f}",
+}
 
+
+@lru_cache(maxsize=64)
 def parse_influxdb_url(url: str) -> Tuple[str, int, bool]:
     """Parse InfluxDB URL and return host, port, and SSL status.
     
@@ -36,12 +54,8 @@ def parse_influxdb_url(url: str) -> Tuple[str, int, bool]:
         
         host = parsed.hostname
         
-        # Determine port
-        if parsed.port:
-            port = parsed.port
-        else:
-            # Default ports
-            port = 8086 if parsed.scheme == 'http' else 8086
+        # Determine port; InfluxDB listens on 8086 for both http and https
+        port = parsed.port or 8086
         
         # Determine SSL
         ssl = parsed.scheme == 'https'
@@ -64,17 +78,8 @@ def validate_google_sheets_id(sheets_id: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    if not sheets_id:
-        return False
-    
-    # Google Sheets ID should be alphanumeric with some special chars
     # Typical format: 1BxiMVs0XRA5nFMdKvBdBZjgmUUqptlbs74OgvE2upms
-    if len(sheets_id) < 40 or len(sheets_id) > 60:
-        return False
-    
-    # Should contain only alphanumeric characters, hyphens, and underscores
-    allowed_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
-    return all(c in allowed_chars for c in sheets_id)
+    return bool(sheets_id) and _SHEETS_ID_RE.fullmatch(sheets_id) is not None
 
 
 def sanitize_entity_name(name: str) -> str:
@@ -89,15 +94,16 @@ def sanitize_entity_name(name: str) -> str:
     if not name:
         return "unknown"
     
-    # Replace spaces and special chars with underscores
-    sanitized = ''.join(c if c.isalnum() else '_' for c in name.lower())
+    # Replace spaces and special chars with underscores; the table only
+    # covers ASCII, so other names take the per-character path
+    sanitized = name.lower()
+    if sanitized.isascii():
+        sanitized = sanitized.translate(_SANITIZE_TABLE)
+    else:
+        sanitized = ''.join(c if c.isalnum() else '_' for c in sanitized)
     
-    # Remove multiple consecutive underscores
-    while '__' in sanitized:
-        sanitized = sanitized.replace('__', '_')
-    
-    # Remove leading/trailing underscores
-    sanitized = sanitized.strip('_')
+    # Collapse runs of underscores and remove leading/trailing ones
+    sanitized = _MULTI_UNDERSCORE.sub('_', sanitized).strip('_')
     
     return sanitized or "unknown"
 
@@ -111,17 +117,23 @@ def format_currency(value: float, currency: str = "USD") -> str:
         
     Returns:
         Formatted currency string
+        
+    Raises:
+        TypeError, ValueError: If value is not numeric
     """
     if value is None:
         return "N/A"
     
-    try:
-        if currency == "USD":
-            return f"${value:,.2f}"
-        else:
-            return f"{value:,.2f} {currency}"
-    except (ValueError, TypeError):
-        return str(value)
+    return _format_currency_cached(value, currency)
+
+
+@lru_cache(maxsize=256)
+def _format_currency_cached(value: float, currency: str) -> str:
+    """Format a non-None currency value; sensor values repeat between updates."""
+    formatter = _CURRENCY_FORMATTERS.get(currency)
+    if formatter is not None:
+        return formatter(value)
+    return f"{value:,.2f} {currency}"
 
 
 def format_percentage(value: float) -> str:
@@ -132,11 +144,37 @@ def format_percentage(value: float) -> str:
         
     Returns:
         Formatted percentage string
+        
+    Raises:
+        TypeError, ValueError: If value is not numeric
     """
     if value is None:
         return "N/A"
     
-    try:
-        return f"{value:.2f}%"
-    except (ValueError, TypeError):
-        return str(value)
\ No newline at end of file
+    return _format_percentage_cached(value)
+
+
+@lru_cache(maxsize=256)
+def _format_percentage_cached(value: float) -> str:
+    """Format a non-None percentage value."""
+    return f"{value:.2f}%"
+
+
+@lru_cache(maxsize=16)
+def get_device_info(config_entry_id: str, sw_version: str) -> DeviceInfo:
+    """Return the shared device info for a config entry.
+    
+    Args:
+        config_entry_id: The config entry the entities belong to
+        sw_version: Integration version from the manifest
+        
+    Returns:
+        DeviceInfo shared by every entity of the entry (treat as read-only)
+    """
+    return DeviceInfo(
+        identifiers={(DOMAIN, config_entry_id)},
+        name="Portfolio Tracker",
+        manufacturer="Portfolio Tracker",
+        model="Home Assistant Integration",
+        sw_version=sw_version,
+    )
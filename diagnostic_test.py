@@ -6,6 +6,7 @@ Run this script to identify potential issues preventing the integration from loa
 
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def test_imports():
@@ -39,11 +40,10 @@ def test_imports():
     
     # Test Google API
     try:
-        from googleapiclient.discovery import build
         from google.oauth2.service_account import Credentials
-        print("✅ Google API client available")
+        print("✅ Google auth library available")
     except ImportError:
-        print("❌ Google API client not available - Google Sheets functionality will fail")
+        print("❌ Google auth library not available - Google Sheets functionality will fail")
 
 def test_manifest():
     """Test manifest.json validity."""
@@ -99,28 +99,36 @@ def test_file_structure():
     
     return all_present
 
+def _parse_file(file_path):
+    """Parse one file and return an error message, or None if it is valid."""
+    try:
+        # compile() also reports errors the parser accepts, such as a
+        # return outside a function or await outside an async function
+        compile(file_path.read_text(), str(file_path), "exec")
+    except SyntaxError as e:
+        return f"Syntax error in {file_path.name}: {e}"
+    except Exception as e:
+        return f"Error parsing {file_path.name}: {e}"
+    return None
+
 def test_syntax():
     """Test Python syntax in key files."""
     print("\nTesting Python syntax...")
     
     base_path = Path("custom_components/portfolio_tracker")
     python_files = ["__init__.py", "config_flow.py", "portfolio_manager.py"]
+    file_paths = [base_path / file for file in python_files if (base_path / file).exists()]
+    
+    # Files are read and parsed concurrently; results are printed in order
+    with ThreadPoolExecutor(max_workers=max(len(file_paths), 1)) as executor:
+        errors = list(executor.map(_parse_file, file_paths))
     
     all_valid = True
-    for file in python_files:
-        file_path = base_path / file
-        if not file_path.exists():
-            continue
-            
-        try:
-            with open(file_path) as f:
-                compile(f.read(), str(file_path), 'exec')
-            print(f"✅ {file}")
-        except SyntaxError as e:
-            print(f"❌ Syntax error in {file}: {e}")
-            all_valid = False
-        except Exception as e:
-            print(f"❌ Error compiling {file}: {e}")
+    for file_path, error in zip(file_paths, errors):
+        if error is None:
+            print(f"✅ {file_path.name}")
+        else:
+            print(f"❌ {error}")
             all_valid = False
     
     return all_valid